@@ -0,0 +1,127 @@
+"""
+Buffered writes for append-only log tables.
+Audit logs and frontend errors are queued in memory and inserted in batches
+by a background task, so each request costs a queue put instead of a commit.
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from database import SessionLocal
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class AuditBuffer:
+    """
+    Collects (model, row) pairs and writes them with one executemany INSERT
+    per model per batch. A batch is flushed once max_batch rows are queued
+    or max_delay seconds after its first row, whichever comes first.
+    """
+    
+    def __init__(
+        self,
+        max_batch: int = 256,
+        max_delay: float = 0.2,
+        max_queue: int = 10000,
+        max_attempts: int = 3,
+        retry_delay: float = 0.5
+    ):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts  # Writes per batch before its rows are dropped
+        self.retry_delay = retry_delay  # Doubles after each failed attempt
+        self.queue: "asyncio.Queue[Tuple[Any, Dict[str, Any]]]" = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0  # Rows discarded (queue full, or every write attempt failed)
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+    
+    def put(self, model, row: Dict[str, Any]) -> None:
+        """Queue a row for insertion into model's table (never blocks)."""
+        try:
+            self.queue.put_nowait((model, row))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Audit buffer full, dropped {model.__tablename__} row")
+    
+    def start(self) -> None:
+        """Start the background writer (call from startup)."""
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """
+        Stop the writer and flush everything still buffered (call from shutdown).
+        The writer is signalled rather than cancelled, so a batch it is holding
+        (e.g. mid-linger) is written before it exits.
+        """
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        
+        while not self.queue.empty():
+            await self._write(self._drain([]))
+    
+    def _drain(self, batch: List[Tuple[Any, Dict[str, Any]]]) -> List[Tuple[Any, Dict[str, Any]]]:
+        """Move queued rows into batch without waiting, up to max_batch."""
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+    
+    async def _run(self) -> None:
+        stopping = asyncio.ensure_future(self._stopping.wait())
+        try:
+            while True:
+                get = asyncio.ensure_future(self.queue.get())
+                await asyncio.wait((get, stopping), return_when=asyncio.FIRST_COMPLETED)
+                if not get.done():
+                    # Stopped with nothing in hand; a cancelled get() loses no row
+                    get.cancel()
+                    return
+                batch = [get.result()]
+                self._drain(batch)
+                if len(batch) < self.max_batch and not stopping.done():
+                    # Linger briefly so bursts share one round-trip (cut short by stop())
+                    await asyncio.wait((stopping,), timeout=self.max_delay)
+                    self._drain(batch)
+                await self._write(batch)
+        finally:
+            stopping.cancel()
+    
+    async def _write(self, batch: List[Tuple[Any, Dict[str, Any]]]) -> None:
+        """Insert a batch, retrying failed attempts with backoff before dropping it."""
+        delay = self.retry_delay
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await self._insert(batch)
+                return
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    self.dropped += len(batch)
+                    logger.error(f"Failed to persist {len(batch)} buffered rows after {attempt} attempts, dropping them: {str(e)}")
+                    return
+                logger.warning(f"Failed to persist {len(batch)} buffered rows (attempt {attempt}), retrying: {str(e)}")
+                await asyncio.sleep(delay)
+                delay *= 2
+    
+    async def _insert(self, batch: List[Tuple[Any, Dict[str, Any]]]) -> None:
+        """One executemany INSERT per model, one commit in total."""
+        rows_by_model: Dict[Any, List[Dict[str, Any]]] = {}
+        for model, row in batch:
+            rows_by_model.setdefault(model, []).append(row)
+        
+        async with SessionLocal() as session:
+            for model, rows in rows_by_model.items():
+                await session.execute(insert(model), rows)
+            await session.commit()
+
+
+# Global buffer instance
+audit_buffer = AuditBuffer()
@@ -0,0 +1,81 @@
+"""
+In-process response cache.
+Simple TTL cache for public, read-heavy responses shared across callers.
+"""
+import hashlib
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# Cache keys
+MAP_DEVICES_CACHE_KEY = "map:devices:v1"
+MAP_PIPELINES_CACHE_KEY = "map:pipelines:v1"
+
+
+def device_channel_cache_key(device_id: str) -> str:
+    """
+    Cache key for a device's (owner, ThingSpeak channel, read key) row.
+    Device ids are UUIDs matched case-insensitively (in the route pattern and
+    the uuid column), so the key is lowercased: reads and invalidations that
+    spell the id differently must land on the same entry.
+    """
+    return f"device:channel:v1:{device_id.lower()}"
+
+
+def make_etag(payload: bytes) -> str:
+    """Strong ETag (quoted content hash) for a serialized response body."""
+    return '"' + hashlib.blake2b(payload, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against the current ETag (RFC 9110,
+    section 13.1.2): "*" matches any current representation; otherwise the
+    header is a comma-separated list compared weakly (W/ prefixes ignored).
+    """
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class ResponseCache:
+    """TTL cache mapping keys to computed responses, with explicit invalidation."""
+    
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Any]] = {}  # {key: (stored_at, value)}
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.time() - stored_at >= self.ttl:
+            self._entries.pop(key, None)
+            return None
+        return value
+    
+    def set(self, key: str, value: Any) -> None:
+        """Store value under key."""
+        self._entries[key] = (time.time(), value)
+    
+    def invalidate(self, *keys: str) -> None:
+        """Drop cached entries (call after writes affecting them)."""
+        for key in keys:
+            self._entries.pop(key, None)
+
+
+# Global cache instances
+# Caches are per process: each uvicorn worker (the Dockerfile runs 2) holds its
+# own entries, and invalidate() only clears the worker that handled the write.
+# Another worker can keep serving (and 304-validating) the previous payload
+# until its entry expires, so ttl bounds how stale a response can be after a write.
+response_cache = ResponseCache(ttl=60.0)
+channel_config_cache = ResponseCache(ttl=30.0)  # Telemetry device lookups (read keys, ownership)
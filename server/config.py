@@ -4,7 +4,7 @@ Simple and clean - all environment variables in one place.
 """
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
-from functools import lru_cache
+from functools import cached_property, lru_cache
 
 
 class Settings(BaseSettings):
@@ -23,6 +23,12 @@ class Settings(BaseSettings):
     
     # Database (Supabase PostgreSQL)
     DATABASE_URL: str
+    # Connection pool (per worker): keep workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    # below the server's max client connections
+    DB_POOL_SIZE: int = 25
+    DB_MAX_OVERFLOW: int = 25
+    DB_POOL_RECYCLE: int = 1800  # seconds
+    DB_POOL_TIMEOUT: int = 5  # seconds to wait for a free connection before failing
     
     # Supabase Authentication
     SUPABASE_URL: str
@@ -36,13 +42,28 @@ class Settings(BaseSettings):
         validation_alias="BACKEND_CORS_ORIGINS"
     )
     
+    # Rate limiting (public map endpoints, per client IP)
+    PUBLIC_RATE_LIMIT_PER_MINUTE: int = 120
+    # Comma-separated proxy IPs/CIDRs whose X-Forwarded-For is trusted for the
+    # client IP (e.g. "10.0.0.0/8" behind Render's load balancer). Empty: the
+    # header is ignored and clients are keyed by their connection address.
+    TRUSTED_PROXIES: str = ""
+    
+    # Concurrency
+    THREAD_POOL_SIZE: int = 100  # AnyIO worker threads for sync dependencies/background work
+    MAX_INFLIGHT: int = 1000  # Uvicorn --limit-concurrency (Dockerfile CMDs, python main.py): 503 beyond this many in-flight requests per worker
+    
     # Logging
     LOG_LEVEL: str = "INFO"
+    REQUEST_LOG_SAMPLE_RATE: float = 0.1  # Fraction of successful requests logged (errors always logged)
+    
+    # Performance monitoring
+    METRICS_ENABLED: bool = True  # False: @track_* decorators become no-ops
     
-    @property
-    def cors_origins_list(self) -> list[str]:
-        """Parse CORS origins into a list."""
-        return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
+    @cached_property
+    def cors_origins_list(self) -> tuple[str, ...]:
+        """Parse CORS origins (once) into an immutable sequence."""
+        return tuple(origin.strip() for origin in self.CORS_ORIGINS.split(","))
 
 
 @lru_cache()
@@ -40,30 +40,44 @@ ssl_context = ssl.create_default_context()
 ssl_context.check_hostname = False
 ssl_context.verify_mode = ssl.CERT_NONE
 
+# Prepared statement caching depends on the connection mode:
+# - Port 6543 (Supabase pooler / pgbouncer transaction mode): a pooled server
+#   connection may change between statements, so cached prepared statements
+#   break (DuplicatePreparedStatementError). Both caches must be disabled.
+# - Port 5432 (direct / session mode): the server connection is pinned, so
+#   caching lets asyncpg reuse parsed plans instead of re-parsing every query.
+uses_transaction_pooler = ":6543/" in db_url
+statement_cache_size = 0 if uses_transaction_pooler else 256
+
 # Create PostgreSQL engine with optimal settings
-# Critical: Supabase pooler (pgbouncer) in transaction mode doesn't support prepared statements
 engine = create_async_engine(
     db_url,
     echo=False,
-    pool_size=5,
-    max_overflow=2,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     pool_pre_ping=True,
-    pool_recycle=300,
+    pool_recycle=settings.DB_POOL_RECYCLE,
     connect_args={
         "ssl": ssl_context,
         "server_settings": {"application_name": "evara_backend_simple"},
         "timeout": 30,
         "command_timeout": 60,
-        "prepared_statement_cache_size": 0,  # Disable asyncpg prepared statement cache
-        "statement_cache_size": 0,  # Also disable statement cache
-    },
-    execution_options={
-        "compiled_cache": None,  # Disable SQLAlchemy compiled cache
+        "prepared_statement_cache_size": statement_cache_size,  # SQLAlchemy asyncpg adapter cache
+        "statement_cache_size": statement_cache_size,  # asyncpg connection statement cache
     },
-    pool_timeout=30
+    # SQLAlchemy's compiled cache is Python-side only (unrelated to server-side
+    # prepared statements), so keep it on to skip recompiling repeated selects
+    query_cache_size=1200,
+    # Rows per multi-row INSERT ... RETURNING when an executemany needs
+    # server-generated values back; plain executemany goes to asyncpg's
+    # prepared-statement executemany
+    insertmanyvalues_page_size=1000,
+    pool_timeout=settings.DB_POOL_TIMEOUT
 )
 
 # Create session factory
+# expire_on_commit=False keeps attributes (including Python-side defaults such as
+# id/created_at) loaded after commit, so endpoints can return new rows without refresh()
 SessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
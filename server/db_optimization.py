@@ -286,6 +286,9 @@ async def batch_update(
     """
     Batch update records efficiently.
     
+    Records that set the same columns share one
+    UPDATE ... FROM (VALUES ...) statement, instead of one UPDATE per record.
+    
     Args:
         db: Database session
         model_class: SQLAlchemy model class
@@ -298,17 +301,32 @@ async def batch_update(
     if not updates:
         return 0
     
-    from sqlalchemy import update
+    from sqlalchemy import column, update, values
+    
+    table = model_class.__table__
     
-    count = 0
+    # Group records by the set of columns they change
+    groups: Dict[tuple, List[tuple]] = {}
     for record in updates:
-        key_value = record.pop(key_field)
-        stmt = update(model_class).where(
-            getattr(model_class, key_field) == key_value
-        ).values(**record)
-        
+        fields = tuple(sorted(k for k in record if k != key_field))
+        groups.setdefault(fields, []).append(
+            (record[key_field], *(record[f] for f in fields))
+        )
+    
+    for fields, rows in groups.items():
+        if not fields:
+            continue
+        names = (key_field, *fields)
+        v = values(
+            *[column(name, table.c[name].type) for name in names],
+            name="v"
+        ).data(rows)
+        stmt = (
+            update(table)
+            .where(table.c[key_field] == v.c[key_field])
+            .values({f: v.c[f] for f in fields})
+        )
         await db.execute(stmt)
-        count += 1
     
     await db.commit()
-    return count
+    return len(updates)
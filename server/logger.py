@@ -2,7 +2,11 @@
 Structured logging utilities for backend
 Pattern: Production-grade logging with levels, formatting, and context
 """
+import atexit
+import copy
 import logging
+import logging.handlers
+import queue
 import sys
 from datetime import datetime
 from typing import Any, Optional
@@ -12,6 +16,87 @@ import json
 # LOGGER CONFIGURATION
 # ============================================================================
 
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that defers formatting to the listener thread.
+    Only the message string is resolved on the caller; exc_info and
+    extra_fields are kept so StructuredFormatter can use them later.
+    """
+    
+    dropped = 0  # Records discarded because the queue was full
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # Never block the event loop on a backed-up stdout: drop and count
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DeferredQueueHandler.dropped += 1
+
+
+class DeferredQueueListener(logging.handlers.QueueListener):
+    """
+    Queue listener whose stop() tolerates a full bounded queue.
+    The stock sentinel put is put_nowait, which raises queue.Full at exit
+    and skips the join, losing every pending record.
+    """
+    
+    def __init__(self, log_queue, *handlers, stop_timeout: float = 5.0, **kwargs):
+        super().__init__(log_queue, *handlers, **kwargs)
+        self.stop_timeout = stop_timeout
+    
+    def enqueue_sentinel(self) -> None:
+        # Wait for the writer to make room rather than failing on a full queue
+        self.queue.put(self._sentinel, timeout=self.stop_timeout)
+    
+    def stop(self) -> None:
+        """Drain pending records, waiting at most about 2 * stop_timeout."""
+        if self._thread:
+            try:
+                self.enqueue_sentinel()
+            except queue.Full:
+                pass  # stdout stalled; join below is bounded, so exit is not blocked
+            self._thread.join(self.stop_timeout)
+            self._thread = None
+        if DeferredQueueHandler.dropped:
+            sys.stderr.write(f"[WARN] {DeferredQueueHandler.dropped} log records dropped (queue full)\n")
+
+
+# Shared queue drained by a single background thread that owns stdout.
+# Bounded so a stalled stdout cannot grow memory without limit.
+LOG_QUEUE_MAX_SIZE = 10000
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(LOG_QUEUE_MAX_SIZE)
+_queue_listener: Optional[DeferredQueueListener] = None
+
+
+def get_log_queue_stats() -> dict:
+    """Queue depth and records dropped since startup (a non-zero drop count means lost logs)."""
+    return {
+        'queue_depth': _log_queue.qsize(),
+        'queue_max_size': LOG_QUEUE_MAX_SIZE,
+        'dropped_records': DeferredQueueHandler.dropped
+    }
+
+
+def _get_queue_listener() -> DeferredQueueListener:
+    """Start the background listener writing structured logs to stdout (once)."""
+    global _queue_listener
+    if _queue_listener is None:
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(StructuredFormatter())
+        _queue_listener = DeferredQueueListener(
+            _log_queue, stream_handler, respect_handler_level=False
+        )
+        _queue_listener.start()
+        atexit.register(_queue_listener.stop)  # Flush pending records on exit
+    return _queue_listener
+
+
 def setup_logger(name: str, level: str = "INFO") -> logging.Logger:
     """
     Create structured logger with proper formatting.
@@ -33,14 +118,12 @@ def setup_logger(name: str, level: str = "INFO") -> logging.Logger:
     if logger.handlers:
         return logger
     
-    # Create console handler with structured formatting
-    handler = logging.StreamHandler(sys.stdout)
+    # Non-blocking handler: records are queued and formatted/written to
+    # stdout as structured JSON by a background thread, off the event loop
+    _get_queue_listener()
+    handler = DeferredQueueHandler(_log_queue)
     handler.setLevel(numeric_level)
     
-    # Structured JSON formatter for production
-    formatter = StructuredFormatter()
-    handler.setFormatter(formatter)
-    
     logger.addHandler(handler)
     return logger
 
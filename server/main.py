@@ -10,27 +10,37 @@ A clean, maintainable FastAPI backend with:
 
 All routes in one file for simplicity and clarity.
 """
-from fastapi import FastAPI, Depends, HTTPException, status, APIRouter
+from fastapi import FastAPI, Depends, HTTPException, status, APIRouter, Request, Path
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text, func
-from typing import List
+from sqlalchemy import select, insert, update, delete, text, func, case, literal_column
+from sqlalchemy.exc import IntegrityError
+from typing import Annotated, List, Dict, Any, Optional, Tuple
 from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+import asyncio
+import re
+import time
 import uuid
+import anyio
+import orjson
 
 # Local imports
 from config import get_settings
-from database import get_db, init_db, engine
-from models import User, Device, Pipeline, Region, Community
+from database import get_db, init_db, engine, SessionLocal
+from models import User, Device, Pipeline, Region, Community, decode_leaflet_positions
 from schemas import (
     UserResponse,
     DeviceCreate,
     DeviceUpdate,
     DeviceResponse,
     DeviceMapResponse,
+    DeviceMapListAdapter,
     PipelineMapResponse,
     TelemetryResponse,
+    TelemetryBatchRequest,
     HealthResponse,
     AuditLogCreate,
     AuditLogResponse,
@@ -41,22 +51,33 @@ from schemas import (
     CommunityResponse,
     CustomerCreate
 )
-from supabase_auth import get_current_user, get_user_id, get_user_email
-from thingspeak import get_thingspeak_client
-from logger import setup_logger, RequestLogger
-from performance import metrics, get_performance_report, check_slow_queries, check_slow_endpoints
+from supabase_auth import get_current_user, get_user_id, get_user_email, get_supabase_admin
+from thingspeak import get_thingspeak_client, close_thingspeak_client
+from logger import setup_logger
+from rate_limit import RateLimiter, parse_trusted_proxies
+from audit_buffer import audit_buffer
+from middleware import ObservabilityMiddleware
+from cache import (
+    response_cache, channel_config_cache, make_etag, etag_matches, device_channel_cache_key,
+    MAP_DEVICES_CACHE_KEY, MAP_PIPELINES_CACHE_KEY
+)
+from performance import get_performance_report, check_slow_queries, check_slow_endpoints
 
 # Initialize settings and logger
 settings = get_settings()
 logger = setup_logger(__name__, settings.LOG_LEVEL)
 
+# Connectivity probe, built once and reused by startup and /health
+_PING = text("SELECT 1")
+
 # Create FastAPI application
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version="1.0.0",
     description="Simplified EvaraTech IoT Platform Backend",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse  # orjson: faster encoding, emits bytes directly
 )
 
 # Create API Router for versioned endpoints
@@ -67,63 +88,34 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins_list,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Explicit lists let CORSMiddleware build preflight headers once at init
+    # instead of echoing Access-Control-Request-Headers on every preflight
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type", "X-Request-ID"],
+)
+
+# Compress larger payloads (map/pipeline lists). Small JSON such as /health
+# stays below minimum_size and is sent as-is; level 5 keeps most of the ratio
+# of the default level 9 at roughly half the CPU.
+app.add_middleware(GZipMiddleware, minimum_size=1500, compresslevel=5)
+
+# Per-IP rate limits for public, unauthenticated endpoints (path prefix -> limiter)
+# These are the most expensive anonymous routes (DB scan + JSON build)
+PUBLIC_RATE_LIMITS = {
+    "/api/v1/devices/map": RateLimiter(requests_per_minute=settings.PUBLIC_RATE_LIMIT_PER_MINUTE),
+    "/api/v1/pipelines": RateLimiter(requests_per_minute=settings.PUBLIC_RATE_LIMIT_PER_MINUTE),
+}
+
+
+# Rate limiting, request logging and metrics in one pure ASGI pass (outermost)
+app.add_middleware(
+    ObservabilityMiddleware,
+    logger=logger,
+    rate_limits=PUBLIC_RATE_LIMITS,
+    sample_rate=settings.REQUEST_LOG_SAMPLE_RATE,
+    trusted_proxies=parse_trusted_proxies(settings.TRUSTED_PROXIES)
 )
 
-# Add request logging middleware
-@app.middleware("http")
-async def log_requests(request, call_next):
-    """Log all requests with timing information and structured logging."""
-    import time
-    import uuid
-    
-    request_id = str(uuid.uuid4())[:8]
-    start_time = time.time()
-    
-    # Create request-scoped logger
-    req_logger = RequestLogger(
-        logger,
-        request_id=request_id,
-        method=request.method,
-        path=str(request.url.path)
-    )
-    
-    # Attach logger to request state for use in endpoints
-    request.state.logger = req_logger
-    
-    try:
-        response = await call_next(request)
-        process_time = round((time.time() - start_time) * 1000, 2)
-        
-        # Log successful request
-        req_logger.info(
-            "Request completed",
-            status_code=response.status_code,
-            duration_ms=process_time
-        )
-        
-        # Record performance metrics
-        metrics.record_api_request(
-            endpoint=str(request.url.path),
-            duration_ms=process_time,
-            status_code=response.status_code
-        )
-        
-        # Add custom headers
-        response.headers["X-Request-ID"] = request_id
-        response.headers["X-Process-Time"] = str(process_time)
-        return response
-        
-    except Exception as e:
-        process_time = round((time.time() - start_time) * 1000, 2)
-        req_logger.error(
-            "Request failed",
-            error=str(e),
-            error_type=type(e).__name__,
-            duration_ms=process_time
-        )
-        raise
 
 # Global exception handler
 @app.exception_handler(Exception)
@@ -131,7 +123,7 @@ async def global_exception_handler(request, exc):
     """Handle unexpected exceptions gracefully."""
     print(f"[UNHANDLED ERROR] {request.method} {request.url.path} - {type(exc).__name__}: {str(exc)}")
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "detail": "Internal server error",
@@ -156,42 +148,68 @@ async def startup_event():
     print(f"CORS Origins: {len(settings.cors_origins_list)} configured")
     print("=" * 80)
     
-    startup_errors = []
+    # Raise AnyIO's default 40-thread limit used for sync dependencies and
+    # sync background tasks so bursts don't queue behind the thread pool
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREAD_POOL_SIZE
+    print(f"[OK] Thread pool size: {settings.THREAD_POOL_SIZE}")
     
-    try:
-        # Initialize database tables with retry logic
-        await init_db()
+    async def _check_db() -> None:
+        """Initialize tables, then verify the connection and report pool stats."""
+        try:
+            # Initialize database tables with retry logic
+            await init_db()
+        except Exception as e:
+            raise RuntimeError(f"Database initialization failed: {e}") from e
         
         # Test database connection
         try:
             async with engine.connect() as conn:
-                await conn.execute(text("SELECT 1"))
-            print("[OK] Database connection verified")
-            
-            # Show pool stats (PostgreSQL only)
-            try:
-                if hasattr(engine.pool, 'size'):
-                    print(f"[OK] Connection pool: size={engine.pool.size()}, checked_out={engine.pool.checkedout()}")
-                else:
-                    print("[OK] Using SQLite (no connection pooling)")
-            except:
-                pass  # Ignore pool stats errors
-                
+                await conn.execute(_PING)
         except Exception as e:
-            startup_errors.append(f"Database connection test failed: {e}")
-            print(f"[ERROR] Database connection test failed: {e}")
+            raise RuntimeError(f"Database connection test failed: {e}") from e
+        print("[OK] Database connection verified")
         
-    except Exception as e:
-        startup_errors.append(f"Database initialization failed: {e}")
-        print(f"[ERROR] Database initialization failed: {e}")
+        # Show pool stats (PostgreSQL only)
+        try:
+            if hasattr(engine.pool, 'size'):
+                print(f"[OK] Connection pool: size={engine.pool.size()}, checked_out={engine.pool.checkedout()}")
+            else:
+                print("[OK] Using SQLite (no connection pooling)")
+        except:
+            pass  # Ignore pool stats errors
+    
+    async def _check_thingspeak() -> None:
+        """Initialize the shared ThingSpeak client and warm its connection pool."""
+        try:
+            thingspeak = get_thingspeak_client()
+        except Exception as e:
+            raise RuntimeError(f"ThingSpeak client initialization failed: {e}") from e
+        print("[OK] ThingSpeak client initialized")
+        
+        # Probe through the shared client so the TLS handshake is reused by
+        # the first telemetry request instead of a throwaway client
+        if await thingspeak.warmup():
+            print("[OK] ThingSpeak API reachable")
     
-    # Verify ThingSpeak connectivity
+    # Table creation and the ThingSpeak probe are independent I/O - run them concurrently
+    results = await asyncio.gather(_check_db(), _check_thingspeak(), return_exceptions=True)
+    startup_errors = [str(result) for result in results if isinstance(result, BaseException)]
+    for error in startup_errors:
+        print(f"[ERROR] {error}")
+    
+    # Start background flusher for buffered last_seen writes
+    _start_last_seen_flusher()
+    
+    # Start batched writer for audit logs / frontend errors
+    audit_buffer.start()
+    
+    # Build the OpenAPI schema (JSON schema for every request/response model)
+    # now; FastAPI caches it, so the first /docs or /openapi.json hit is cheap
     try:
-        thingspeak = get_thingspeak_client()
-        print("[OK] ThingSpeak client initialized")
+        app.openapi()
+        print("[OK] OpenAPI schema built")
     except Exception as e:
-        startup_errors.append(f"ThingSpeak client initialization failed: {e}")
-        print(f"[WARN] ThingSpeak client initialization failed: {e}")
+        print(f"[WARN] OpenAPI schema build failed: {e}")
     
     print("=" * 80)
     if startup_errors:
@@ -212,10 +230,23 @@ async def shutdown_event():
     print("👋 Shutting down EvaraTech Backend...")
     print("=" * 80)
     
-    # Close ThingSpeak client
+    # Stop last_seen flusher and write any pending timestamps
     try:
-        thingspeak = get_thingspeak_client()
-        await thingspeak.close()
+        await _stop_last_seen_flusher()
+        print("[OK] Pending last_seen updates flushed")
+    except Exception as e:
+        print(f"[WARN] Error flushing last_seen updates: {e}")
+    
+    # Stop audit writer and insert any rows still queued
+    try:
+        await audit_buffer.stop()
+        print("[OK] Pending audit rows flushed")
+    except Exception as e:
+        print(f"[WARN] Error flushing audit rows: {e}")
+    
+    # Close ThingSpeak client (without creating one just to close it)
+    try:
+        await close_thingspeak_client()
         print("[OK] ThingSpeak client closed")
     except Exception as e:
         print(f"[WARN] Error closing ThingSpeak client: {e}")
@@ -267,27 +298,36 @@ async def config_check():
     }
 
 
-@app.get("/health", response_model=HealthResponse, tags=["health"])
-async def health_check():
-    """
-    Comprehensive system health check endpoint.
-    Tests database connectivity and returns detailed system status.
+# Cached health probe results: load balancer pings within the TTL reuse the
+# last probe instead of each opening a pooled connection for SELECT 1
+HEALTH_DB_CACHE_TTL = 3.0  # seconds
+HEALTH_THINGSPEAK_CACHE_TTL = 10.0  # External status rarely flips faster
+# How long past its TTL a result may still be served while it is being
+# refreshed. Beyond this the stale value could hide an outage, so /health
+# waits up to this long for the refresh and otherwise reports degraded.
+HEALTH_STALE_GRACE = 2.0  # seconds
+_health_cache: Dict[str, tuple] = {}  # {probe_name: (expires_at, result)}
+_health_refresh_tasks: Dict[str, asyncio.Task] = {}  # {probe_name: in-flight refresh}
+
+# Reported when a probe raises or its refresh is overdue
+_DB_PROBE_UNAVAILABLE = ("error: health probe failed or overdue", "degraded")
+_THINGSPEAK_PROBE_UNAVAILABLE = "error: health probe failed or overdue"
+
+
+async def _check_database_health() -> tuple:
     """
-    db_status = "ok"
-    thingspeak_status = "ok"
-    overall_status = "ok"
+    Probe the database with SELECT 1 (5s timeout).
     
-    # Database health check with timeout
+    Returns:
+        tuple: (db_status, overall_status)
+    """
     try:
-        import time
-        import asyncio
         start_time = time.time()
         
         # Add 5 second timeout for health check (compatible with Python 3.9+)
         async def check_db():
             async with engine.connect() as conn:
-                # Force no prepared statements for pooler compatibility
-                result = await conn.execute(text("SELECT 1"))
+                result = await conn.execute(_PING)
                 result.fetchone()  # Don't await - fetchone() is synchronous
         
         await asyncio.wait_for(check_db(), timeout=5.0)
@@ -297,39 +337,96 @@ async def health_check():
         # Adjusted threshold for cloud database (Supabase pooler connection)
         # 3 seconds is reasonable for cross-region database connections
         if response_time > 3000:
-            db_status = "slow"
-            overall_status = "degraded"
+            return "slow", "degraded"
+        return "ok", "ok"
     
     except asyncio.TimeoutError:
-        db_status = "error: timeout"
-        overall_status = "critical"
-        thingspeak_status = "unknown"
+        return "error: timeout", "critical"
         
     except Exception as e:
-        db_status = f"error: {str(e)[:100]}"
-        overall_status = "critical"
-        thingspeak_status = "unknown"
-    
-    # ThingSpeak health check (lightweight)
+        return f"error: {str(e)[:100]}", "critical"
+
+
+async def _check_thingspeak_health() -> str:
+    """Lightweight ThingSpeak check: shared client is available (no API call)."""
     try:
-        # Just check if client can be initialized, don't make actual API call
         thingspeak = get_thingspeak_client()
-        if thingspeak:
-            thingspeak_status = "ok"
-        else:
-            thingspeak_status = "not_initialized"
+        return "ok" if thingspeak else "not_initialized"
+    except Exception:
+        return "error"
+
+
+async def _refresh_probe(name: str, ttl: float, probe, unavailable):
+    """Run a probe and store its result (or unavailable, if it raised) for ttl seconds."""
+    try:
+        result = await probe()
     except Exception:
-        thingspeak_status = "error"
+        result = unavailable  # Never keep serving the previous value after a failed refresh
+    _health_cache[name] = (time.monotonic() + ttl, result)
+    return result
+
+
+async def _cached_probe(name: str, ttl: float, probe, unavailable):
+    """
+    Return a memoized probe result.
+    
+    - Fresh (younger than ttl): returned as-is.
+    - Stale by at most HEALTH_STALE_GRACE: returned immediately while a
+      single background refresh runs.
+    - Staler than that: wait up to HEALTH_STALE_GRACE for the refresh, then
+      report unavailable (degraded) rather than an outdated "ok".
+    - Cold cache: wait for the first probe.
+    """
+    now = time.monotonic()
+    cached = _health_cache.get(name)
+    if cached is not None and now < cached[0]:
+        return cached[1]
+    
+    # At most one probe in flight per name, however many requests arrive
+    task = _health_refresh_tasks.get(name)
+    if task is None or task.done():
+        task = asyncio.create_task(_refresh_probe(name, ttl, probe, unavailable))
+        _health_refresh_tasks[name] = task
+    
+    if cached is None:
+        return await asyncio.shield(task)
+    if now < cached[0] + HEALTH_STALE_GRACE:
+        return cached[1]
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), timeout=HEALTH_STALE_GRACE)
+    except asyncio.TimeoutError:
+        return unavailable
+
+
+@app.get("/health", response_model=HealthResponse, tags=["health"])
+async def health_check():
+    """
+    Comprehensive system health check endpoint.
+    Tests database connectivity and returns detailed system status.
+    Probes run concurrently; results are cached for HEALTH_DB_CACHE_TTL
+    (database) and HEALTH_THINGSPEAK_CACHE_TTL (ThingSpeak) seconds and
+    refreshed in the background. A result more than HEALTH_STALE_GRACE
+    seconds past its TTL is never served, so an outage shows up as
+    degraded/critical within TTL + grace.
+    """
+    (db_status, overall_status), thingspeak_status = await asyncio.gather(
+        _cached_probe("database", HEALTH_DB_CACHE_TTL, _check_database_health, _DB_PROBE_UNAVAILABLE),
+        _cached_probe(
+            "thingspeak", HEALTH_THINGSPEAK_CACHE_TTL, _check_thingspeak_health, _THINGSPEAK_PROBE_UNAVAILABLE
+        )
+    )
     
-    return HealthResponse(
-        status=overall_status,
-        database=db_status,
-        timestamp=datetime.utcnow(),
-        services={
+    # Serialized directly with orjson (HealthResponse shape, documented via
+    # response_model) - skips response_model validation on a polled endpoint
+    return ORJSONResponse({
+        "status": overall_status,
+        "database": db_status,
+        "timestamp": datetime.utcnow(),
+        "services": {
             "database": db_status,
             "thingspeak": thingspeak_status
         }
-    )
+    })
 
 
 # ============================================================================
@@ -391,8 +488,7 @@ async def sync_user_profile(
     email = get_user_email(user_payload)
     
     # Check if user exists
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
     
     if not user:
         # Create new user
@@ -404,14 +500,12 @@ async def sync_user_profile(
         )
         db.add(user)
         await db.commit()
-        await db.refresh(user)
         print(f"[INFO] Created new user: {email}")
     else:
         # Update email if changed
         if user.email != email:
             user.email = email
             await db.commit()
-            await db.refresh(user)
     
     return user
 
@@ -424,8 +518,7 @@ async def get_current_user_profile(
     """Get current authenticated user's profile."""
     user_id = get_user_id(user_payload)
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -467,8 +560,7 @@ async def create_community(
     user_id = get_user_id(user_payload)
     
     # Get user role
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
     
     if not user or user.role != "superadmin":
         raise HTTPException(
@@ -477,8 +569,7 @@ async def create_community(
         )
     
     # Validate region exists
-    result = await db.execute(select(Region).where(Region.id == community.region_id))
-    region = result.scalar_one_or_none()
+    region = await db.get(Region, community.region_id)
     
     if not region:
         raise HTTPException(
@@ -498,7 +589,6 @@ async def create_community(
     
     db.add(new_community)
     await db.commit()
-    await db.refresh(new_community)
     
     return new_community
 
@@ -533,8 +623,7 @@ async def get_community(
     Get a single community by ID.
     No authentication required - public data.
     """
-    result = await db.execute(select(Community).where(Community.id == community_id))
-    community = result.scalar_one_or_none()
+    community = await db.get(Community, community_id)
     
     if not community:
         raise HTTPException(
@@ -559,13 +648,10 @@ async def create_customer(
     1. Creates user in Supabase Auth
     2. Creates user record in local database with community link
     """
-    from supabase import create_client, Client
-    
     user_id = get_user_id(user_payload)
     
     # Get user role - only superadmin can create customers
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
     
     if not user or user.role != "superadmin":
         raise HTTPException(
@@ -574,8 +660,7 @@ async def create_customer(
         )
     
     # Validate community exists
-    result = await db.execute(select(Community).where(Community.id == customer.community_id))
-    community = result.scalar_one_or_none()
+    community = await db.get(Community, customer.community_id)
     
     if not community:
         raise HTTPException(
@@ -585,7 +670,7 @@ async def create_customer(
     
     # Create user in Supabase (admin API)
     try:
-        supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+        supabase = get_supabase_admin()
         
         # Create user in Supabase Auth
         auth_response = supabase.auth.admin.create_user({
@@ -620,7 +705,6 @@ async def create_customer(
     
     db.add(new_user)
     await db.commit()
-    await db.refresh(new_user)
     
     return new_user
 
@@ -632,8 +716,7 @@ async def create_customer(
 @api_router.post("/audit-logs", response_model=AuditLogResponse, status_code=status.HTTP_201_CREATED, tags=["audit"])
 async def create_audit_log(
     audit_data: AuditLogCreate,
-    user_payload: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    user_payload: dict = Depends(get_current_user)
 ):
     """
     Create audit log entry.
@@ -643,24 +726,27 @@ async def create_audit_log(
     - User create/update
     - Pipeline create/update/delete
     - Login/logout events
+    
+    The row is queued on the audit buffer and inserted in a batch shortly
+    after, so the 201 is returned without waiting on the database.
     """
     from models import AuditLog
     
     user_id = get_user_id(user_payload)
     
-    audit_log = AuditLog(
-        user_id=user_id,
-        action=audit_data.action,
-        resource_type=audit_data.resource_type,
-        resource_id=audit_data.resource_id,
-        details=audit_data.details
-    )
-    
-    db.add(audit_log)
-    await db.commit()
-    await db.refresh(audit_log)
+    # id/created_at set here (not at insert) so the response is complete up front
+    row = {
+        "id": str(uuid.uuid4()),
+        "created_at": datetime.utcnow(),
+        "user_id": user_id,
+        "action": audit_data.action,
+        "resource_type": audit_data.resource_type,
+        "resource_id": audit_data.resource_id,
+        "details": audit_data.details
+    }
+    audit_buffer.put(AuditLog, row)
     
-    return audit_log
+    return row
 
 
 # ============================================================================
@@ -668,15 +754,13 @@ async def create_audit_log(
 # ============================================================================
 
 @api_router.post("/frontend-errors", response_model=FrontendErrorResponse, status_code=status.HTTP_201_CREATED, tags=["monitoring"])
-async def log_frontend_error(
-    error_data: FrontendErrorCreate,
-    db: AsyncSession = Depends(get_db)
-):
+async def log_frontend_error(error_data: FrontendErrorCreate):
     """
     Log frontend error for monitoring.
     
     This endpoint does NOT require authentication (to capture errors even when auth fails).
     Frontend ErrorBoundary calls this to track React errors.
+    The row is queued on the audit buffer and inserted in a batch.
     """
     from models import FrontendError
     
@@ -684,27 +768,33 @@ async def log_frontend_error(
     user_id = None
     # You could optionally parse the token here if needed, but we keep it simple
     
-    frontend_error = FrontendError(
-        error_message=error_data.error_message,
-        stack_trace=error_data.stack_trace,
-        url=error_data.url,
-        user_agent=error_data.user_agent,
-        user_id=user_id
-    )
-    
-    db.add(frontend_error)
-    await db.commit()
-    await db.refresh(frontend_error)
+    row = {
+        "id": str(uuid.uuid4()),
+        "created_at": datetime.utcnow(),
+        "error_message": error_data.error_message,
+        "stack_trace": error_data.stack_trace,
+        "url": error_data.url,
+        "user_agent": error_data.user_agent,
+        "user_id": user_id
+    }
+    audit_buffer.put(FrontendError, row)
     
     print(f"[FRONTEND ERROR] {error_data.error_message} at {error_data.url}")
     
-    return frontend_error
+    return row
 
 
 # ============================================================================
 # DEVICE MANAGEMENT ENDPOINTS
 # ============================================================================
 
+# Device ids are native UUIDs in the database: malformed ids are rejected
+# (422) at routing instead of reaching Postgres as an invalid cast
+UUID_PATTERN = r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+_UUID_RE = re.compile(UUID_PATTERN)
+DeviceId = Annotated[str, Path(pattern=UUID_PATTERN, description="Device UUID")]
+
+
 @api_router.get("/devices", response_model=List[DeviceResponse], tags=["devices"])
 async def list_devices(
     user_payload: dict = Depends(get_current_user),
@@ -723,6 +813,22 @@ async def list_devices(
     return devices
 
 
+def _is_node_key_conflict(exc: IntegrityError) -> bool:
+    """
+    True when an IntegrityError is a unique violation (SQLSTATE 23505) on
+    devices.node_key, whichever unique index enforces it.
+    """
+    orig = exc.orig
+    sqlstate = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    if sqlstate != "23505":
+        return False
+    # asyncpg keeps the constraint name on the driver exception behind the DBAPI wrapper
+    constraint = getattr(orig, "constraint_name", None) or getattr(orig.__cause__, "constraint_name", None)
+    if constraint:
+        return "node_key" in constraint
+    return "node_key" in str(orig)
+
+
 @api_router.post("/devices", response_model=DeviceResponse, status_code=status.HTTP_201_CREATED, tags=["devices"])
 async def create_device(
     device_in: DeviceCreate,
@@ -736,45 +842,53 @@ async def create_device(
     """
     user_id = get_user_id(user_payload)
     
-    # Check if node_key already exists
-    result = await db.execute(
-        select(Device).where(Device.node_key == device_in.node_key)
-    )
-    if result.scalar_one_or_none():
+    # Create device: single INSERT ... RETURNING (id comes from the column default)
+    # node_key uniqueness is enforced by the UNIQUE constraint - no pre-check
+    # SELECT, and concurrent creates with the same key can't both succeed
+    device_data = device_in.dict()
+    try:
+        result = await db.execute(
+            insert(Device)
+            .values(
+                user_id=user_id,
+                lat=device_data["latitude"],  # Legacy columns mirror the primary geo fields
+                lng=device_data["longitude"],
+                **device_data
+            )
+            .returning(Device)
+        )
+        device = result.scalar_one()
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if not _is_node_key_conflict(e):
+            raise  # FK/NOT NULL/CHECK violations are not duplicate keys
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Device with node_key '{device_in.node_key}' already exists"
-        )
+        ) from e
+    response_cache.invalidate(MAP_DEVICES_CACHE_KEY)
     
-    # Create device
-    device = Device(
-        id=str(uuid.uuid4()),
-        user_id=user_id,
-        **device_in.dict()
+    logger.info(
+        "device.created",
+        extra={'extra_fields': {'label': device.label, 'node_key': device.node_key}}
     )
-    db.add(device)
-    await db.commit()
-    await db.refresh(device)
-    
-    print(f"[INFO] Created device: {device.label} ({device.node_key})")
     return device
 
 
 @api_router.get("/devices/{device_id}", response_model=DeviceResponse, tags=["devices"])
 async def get_device(
-    device_id: str,
+    device_id: DeviceId,
     user_payload: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific device by ID."""
     user_id = get_user_id(user_payload)
     
-    result = await db.execute(
-        select(Device).where(Device.id == device_id, Device.user_id == user_id)
-    )
-    device = result.scalar_one_or_none()
+    # Primary-key lookup (identity map first), then enforce ownership
+    device = await db.get(Device, device_id)
     
-    if not device:
+    if not device or device.user_id != user_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Device not found"
@@ -785,7 +899,7 @@ async def get_device(
 
 @api_router.put("/devices/{device_id}", response_model=DeviceResponse, tags=["devices"])
 async def update_device(
-    device_id: str,
+    device_id: DeviceId,
     device_in: DeviceUpdate,
     user_payload: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -793,9 +907,21 @@ async def update_device(
     """Update a device's information."""
     user_id = get_user_id(user_payload)
     
-    # Get device
+    # Single round-trip: UPDATE ... WHERE id AND owner ... RETURNING *
+    # (updated_at is set by the column's onupdate=func.now())
+    update_data = device_in.dict(exclude_unset=True)
+    
+    # Legacy lat/lng columns mirror the primary geo fields
+    if "latitude" in update_data:
+        update_data["lat"] = update_data["latitude"]
+    if "longitude" in update_data:
+        update_data["lng"] = update_data["longitude"]
+    
     result = await db.execute(
-        select(Device).where(Device.id == device_id, Device.user_id == user_id)
+        update(Device)
+        .where(Device.id == device_id, Device.user_id == user_id)
+        .values(**update_data)
+        .returning(Device)
     )
     device = result.scalar_one_or_none()
     
@@ -805,50 +931,132 @@ async def update_device(
             detail="Device not found"
         )
     
-    # Update fields
-    update_data = device_in.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(device, field, value)
-    
-    device.updated_at = datetime.utcnow()
-    
     await db.commit()
-    await db.refresh(device)
+    response_cache.invalidate(MAP_DEVICES_CACHE_KEY)
+    channel_config_cache.invalidate(device_channel_cache_key(device_id))
     
-    print(f"[INFO] Updated device: {device.label} ({device.node_key})")
+    logger.info(
+        "device.updated",
+        extra={'extra_fields': {'label': device.label, 'node_key': device.node_key}}
+    )
     return device
 
 
 @api_router.delete("/devices/{device_id}", status_code=status.HTTP_200_OK, tags=["devices"])
 async def delete_device(
-    device_id: str,
+    device_id: DeviceId,
     user_payload: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a device."""
     user_id = get_user_id(user_payload)
     
-    # Get device
+    # Single round-trip: DELETE ... WHERE id AND owner ... RETURNING label, node_key
     result = await db.execute(
-        select(Device).where(Device.id == device_id, Device.user_id == user_id)
+        delete(Device)
+        .where(Device.id == device_id, Device.user_id == user_id)
+        .returning(Device.label, Device.node_key)
     )
-    device = result.scalar_one_or_none()
+    deleted = result.one_or_none()
     
-    if not device:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Device not found"
         )
     
-    await db.delete(device)
     await db.commit()
+    response_cache.invalidate(MAP_DEVICES_CACHE_KEY)
+    channel_config_cache.invalidate(device_channel_cache_key(device_id))
     
-    print(f"[INFO] Deleted device: {device.label} ({device.node_key})")
+    logger.info(
+        "device.deleted",
+        extra={'extra_fields': {'label': deleted.label, 'node_key': deleted.node_key}}
+    )
     return {"message": "Device deleted successfully", "device_id": device_id}
 
 
+# Last content change per map payload: {cache_key: (etag, last_modified)}.
+# Advanced only when a rebuilt payload's ETag differs, so it tracks real data
+# changes (API writes and out-of-band seed scripts) rather than cache expiry.
+_map_versions: Dict[str, Tuple[str, float]] = {}
+
+
+def _map_payload_entry(cache_key: str, payload: bytes) -> Tuple[str, bytes, float]:
+    """Compute a serialized map payload's ETag / Last-Modified (the cache entry)."""
+    etag = make_etag(payload)
+    
+    previous = _map_versions.get(cache_key)
+    if previous is not None and previous[0] == etag:
+        last_modified = previous[1]
+    else:
+        last_modified = float(int(time.time()))  # HTTP dates have 1s resolution
+        _map_versions[cache_key] = (etag, last_modified)
+    
+    return etag, payload, last_modified
+
+
+def _not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """
+    Evaluate conditional GET headers against the current payload version.
+    If-None-Match takes precedence; If-Modified-Since is only consulted
+    when the client sent no ETag (RFC 9110, section 13.2.2).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return parsedate_to_datetime(if_modified_since).timestamp() >= last_modified
+        except (TypeError, ValueError):
+            return False  # Malformed date: ignore the header
+    return False
+
+
+def _map_response(request: Request, entry: Tuple[str, bytes, float]) -> Response:
+    """
+    Return a cached map payload, or 304 Not Modified when the client
+    already holds the current version (If-None-Match / If-Modified-Since).
+    """
+    etag, payload, last_modified = entry
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        "Cache-Control": "public, max-age=30"
+    }
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+# Map query: only select required fields. Built once at import; its compiled
+# form is reused from SQLAlchemy's compiled cache on every cache miss.
+_MAP_DEVICES_QUERY = (
+    select(
+        Device.id,
+        Device.name,
+        Device.asset_type,
+        Device.asset_category,
+        Device.latitude,
+        Device.longitude,
+        Device.capacity,
+        Device.specifications,
+        Device.status
+    )
+    # Inline literal (not a bind parameter) so even a generic plan can match
+    # the partial index idx_devices_map_sorted (WHERE is_active = 'true', migration 007)
+    .where(Device.is_active == literal_column("'true'"))
+    .where(Device.latitude.isnot(None))
+    .where(Device.longitude.isnot(None))
+    .order_by(Device.asset_type, Device.name)
+)
+
+
 @api_router.get("/devices/map/all", response_model=List[DeviceMapResponse], tags=["devices", "map"])
 async def get_map_devices(
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -856,118 +1064,60 @@ async def get_map_devices(
     Returns all active devices with minimal fields for fast map loading.
     No authentication required for public map display.
     Performance target: <200ms P95
+    
+    Served from an in-process cache (60s TTL), invalidated on device writes.
+    Responses carry ETag / Last-Modified; matching conditional requests get 304.
     """
-    import time
+    cached_entry = response_cache.get(MAP_DEVICES_CACHE_KEY)
+    if cached_entry is not None:
+        return _map_response(request, cached_entry)
+    
     start_time = time.time()
     
-    # Optimized query: only select required fields
-    result = await db.execute(
-        select(
-            Device.id,
-            Device.name,
-            Device.asset_type,
-            Device.asset_category,
-            Device.latitude,
-            Device.longitude,
-            Device.capacity,
-            Device.specifications,
-            Device.status
-        )
-        .where(Device.is_active == 'true')
-        .where(Device.latitude.isnot(None))
-        .where(Device.longitude.isnot(None))
-        .order_by(Device.asset_type, Device.name)
-    )
+    result = await db.execute(_MAP_DEVICES_QUERY)
     
-    # Build response objects
-    devices = []
-    for row in result.all():
-        devices.append(DeviceMapResponse(
-            id=row[0],
-            name=row[1],
-            asset_type=row[2],
-            asset_category=row[3],
-            latitude=row[4],
-            longitude=row[5],
-            capacity=row[6],
-            specifications=row[7],
-            status=row[8]
-        ))
+    # Rows go straight to the list adapter (fields read by column name), which
+    # validates and dumps the whole list in single pydantic-core calls
+    devices = DeviceMapListAdapter.validate_python(result.all(), from_attributes=True)
     
     query_time = (time.time() - start_time) * 1000
-    print(f"[MAP] Loaded {len(devices)} devices in {query_time:.2f}ms")
+    logger.info(
+        "map.devices_loaded",
+        extra={'extra_fields': {'count': len(devices), 'duration_ms': round(query_time, 2)}}
+    )
     
-    return devices
+    entry = _map_payload_entry(MAP_DEVICES_CACHE_KEY, DeviceMapListAdapter.dump_json(devices))
+    response_cache.set(MAP_DEVICES_CACHE_KEY, entry)
+    return _map_response(request, entry)
 
 
 # ============================================================================
 # NODE ENDPOINTS (Aliases for /devices endpoints)
 # Frontend uses /nodes/ terminology
+# Registered on the device handlers directly: no wrapper call frame and no
+# second resolution of get_current_user/get_db per aliased request
 # ============================================================================
 
-@api_router.get("/nodes", response_model=List[DeviceResponse], tags=["nodes"])
-async def list_nodes(
-    user_payload: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """
-    List all nodes (alias for list_devices).
-    Frontend compatibility endpoint.
-    """
-    return await list_devices(user_payload=user_payload, db=db)
-
-
-@api_router.get("/nodes/{node_id}", response_model=DeviceResponse, tags=["nodes"])
-async def get_node(
-    node_id: str,
-    user_payload: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """
-    Get a single node by ID (alias for get_device).
-    Frontend compatibility endpoint.
-    """
-    return await get_device(device_id=node_id, user_payload=user_payload, db=db)
-
-
-@api_router.post("/nodes", response_model=DeviceResponse, status_code=status.HTTP_201_CREATED, tags=["nodes"])
-async def create_node(
-    device_in: DeviceCreate,
-    user_payload: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """
-    Create a new node (alias for create_device).
-    Frontend compatibility endpoint.
-    """
-    return await create_device(device_in=device_in, user_payload=user_payload, db=db)
-
-
-@api_router.patch("/nodes/{node_id}", response_model=DeviceResponse, tags=["nodes"])
-async def update_node(
-    node_id: str,
-    device_in: DeviceUpdate,
-    user_payload: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """
-    Update a node (alias for update_device).
-    Frontend compatibility endpoint.
-    """
-    return await update_device(device_id=node_id, device_in=device_in, user_payload=user_payload, db=db)
-
-
-@api_router.delete("/nodes/{node_id}", status_code=status.HTTP_200_OK, tags=["nodes"])
-async def delete_node(
-    node_id: str,
-    user_payload: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """
-    Delete a node (alias for delete_device).
-    Frontend compatibility endpoint.
-    """
-    return await delete_device(device_id=node_id, user_payload=user_payload, db=db)
+api_router.add_api_route(
+    "/nodes", list_devices, methods=["GET"],
+    response_model=List[DeviceResponse], tags=["nodes"]
+)
+api_router.add_api_route(
+    "/nodes/{device_id}", get_device, methods=["GET"],
+    response_model=DeviceResponse, tags=["nodes"]
+)
+api_router.add_api_route(
+    "/nodes", create_device, methods=["POST"],
+    response_model=DeviceResponse, status_code=status.HTTP_201_CREATED, tags=["nodes"]
+)
+api_router.add_api_route(
+    "/nodes/{device_id}", update_device, methods=["PATCH"],
+    response_model=DeviceResponse, tags=["nodes"]
+)
+api_router.add_api_route(
+    "/nodes/{device_id}", delete_device, methods=["DELETE"],
+    status_code=status.HTTP_200_OK, tags=["nodes"]
+)
 
 
 # ============================================================================
@@ -976,6 +1126,7 @@ async def delete_node(
 
 @api_router.get("/pipelines", response_model=List[PipelineMapResponse], tags=["pipelines", "map"])
 async def list_pipelines(
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -983,83 +1134,224 @@ async def list_pipelines(
     Returns minimal fields optimized for Leaflet polylines.
     No authentication required for public map display.
     Performance target: <200ms P95
+    
+    Served from an in-process cache (60s TTL) with ETag / Last-Modified / 304 support.
     """
-    import time
+    cached_entry = response_cache.get(MAP_PIPELINES_CACHE_KEY)
+    if cached_entry is not None:
+        return _map_response(request, cached_entry)
+    
     start_time = time.time()
     
-    # Optimized query: only select required fields
+    # Optimized query: only select required fields.
+    # Polylines come from the packed float32 coordinates_bin (migration 012):
+    # decoding is a memcpy instead of a JSON parse. Rows written without it
+    # fall back to leaflet_positions() (migration 009), which swaps GeoJSON
+    # [lng, lat] to React-Leaflet [lat, lng] in Postgres.
     result = await db.execute(
         select(
             Pipeline.id,
             Pipeline.name,
-            Pipeline.coordinates,
+            Pipeline.coordinates_bin,
+            case(
+                (
+                    Pipeline.coordinates_bin.is_(None),
+                    func.leaflet_positions(Pipeline.coordinates, type_=Pipeline.coordinates.type)
+                )
+            ),
             Pipeline.color
         )
         .where(Pipeline.is_active == True)  # Boolean comparison (pipelines table uses BOOLEAN)
         .order_by(Pipeline.pipeline_type, Pipeline.name)
     )
     
-    # Build response objects
-    pipelines = []
-    for row in result.all():
-        # Convert GeoJSON coordinates [[lng, lat], [lng, lat]] to React-Leaflet format [[lat, lng], [lat, lng]]
-        geojson_coords = row[2]  # [[lng, lat], ...]
-        positions = [[coord[1], coord[0]] for coord in geojson_coords]  # [[lat, lng], ...]
-        
-        pipelines.append(PipelineMapResponse(
-            id=row[0],
-            name=row[1],
-            positions=positions,
-            color=row[3]
-        ))
+    # Plain dicts in the PipelineMapResponse shape. Built here from known
+    # types, so they skip validation and go straight to orjson, which writes
+    # the (potentially thousands of) position floats in C
+    pipelines = [
+        {
+            "id": row[0],
+            "name": row[1],
+            "positions": decode_leaflet_positions(row[2]) if row[2] is not None else row[3],
+            "color": row[4]
+        }
+        for row in result.all()
+    ]
     
     query_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-    print(f"[PIPELINES] Loaded {len(pipelines)} pipelines in {query_time:.2f}ms")
+    logger.info(
+        "map.pipelines_loaded",
+        extra={'extra_fields': {'count': len(pipelines), 'duration_ms': round(query_time, 2)}}
+    )
     
-    return pipelines
+    entry = _map_payload_entry(MAP_PIPELINES_CACHE_KEY, orjson.dumps(pipelines))
+    response_cache.set(MAP_PIPELINES_CACHE_KEY, entry)
+    return _map_response(request, entry)
 
 
 # ============================================================================
 # THINGSPEAK TELEMETRY ENDPOINTS
 # ============================================================================
 
-@api_router.get("/devices/{device_id}/telemetry/latest", response_model=TelemetryResponse, tags=["telemetry"])
-async def get_latest_telemetry(
-    device_id: str,
-    user_payload: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
+# Buffered last_seen writes: telemetry reads record timestamps in memory and a
+# background task flushes them in one batched UPDATE per interval, keeping the
+# DB write off the response path
+LAST_SEEN_FLUSH_INTERVAL = 30  # seconds
+_last_seen_buffer: Dict[str, datetime] = {}
+_last_seen_flush_task: Optional[asyncio.Task] = None
+_last_seen_stopping = asyncio.Event()
+
+
+def _mark_last_seen(*device_ids: str) -> None:
+    """Record that devices reported telemetry now (flushed later)."""
+    now = datetime.utcnow()
+    for device_id in device_ids:
+        _last_seen_buffer[device_id] = now
+
+
+def _last_seen_update(pending: Dict[str, datetime]):
     """
-    Get latest telemetry data from ThingSpeak for a device.
-    
-    Device must have thingspeak_channel_id configured.
+    Build the batched last_seen UPDATE ... CASE.
+    updated_at is pinned to itself so the column's onupdate=now() does not
+    fire: telemetry heartbeats are not edits to the device record.
     """
-    user_id = get_user_id(user_payload)
+    return (
+        update(Device)
+        .where(Device.id.in_(list(pending)))
+        .values(last_seen=case(pending, value=Device.id), updated_at=Device.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _flush_last_seen() -> None:
+    """Write buffered last_seen timestamps with a single UPDATE ... CASE."""
+    if not _last_seen_buffer:
+        return
     
-    # Get device
-    result = await db.execute(
-        select(Device).where(Device.id == device_id, Device.user_id == user_id)
+    pending = dict(_last_seen_buffer)
+    _last_seen_buffer.clear()
+    
+    written = False
+    try:
+        async with SessionLocal() as session:
+            await session.execute(_last_seen_update(pending))
+            await session.commit()
+        written = True
+    except Exception as e:
+        logger.error(f"Failed to flush last_seen for {len(pending)} devices: {str(e)}")
+    finally:
+        if not written:
+            # Re-queue (also on cancellation), keeping any newer timestamps recorded meanwhile
+            for device_id, seen_at in pending.items():
+                _last_seen_buffer.setdefault(device_id, seen_at)
+
+
+async def _last_seen_flush_loop() -> None:
+    """Periodically flush buffered last_seen updates until asked to stop."""
+    while not _last_seen_stopping.is_set():
+        try:
+            await asyncio.wait_for(_last_seen_stopping.wait(), timeout=LAST_SEEN_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        await _flush_last_seen()
+
+
+def _start_last_seen_flusher() -> None:
+    """Start the background last_seen flusher (call from startup)."""
+    global _last_seen_flush_task
+    if _last_seen_flush_task is None:
+        _last_seen_stopping.clear()
+        _last_seen_flush_task = asyncio.create_task(_last_seen_flush_loop())
+
+
+async def _stop_last_seen_flusher() -> None:
+    """
+    Stop the flusher and write every pending timestamp (call from shutdown).
+    The loop is signalled rather than cancelled, so an UPDATE already in
+    flight completes before the engine is disposed.
+    """
+    global _last_seen_flush_task
+    if _last_seen_flush_task is not None:
+        _last_seen_stopping.set()
+        await _last_seen_flush_task
+        _last_seen_flush_task = None
+    await _flush_last_seen()  # Rows marked (or re-queued) after the loop's last pass
+
+
+# ThingSpeak feed keys exposed in telemetry responses
+_TELEMETRY_KEYS = (
+    "entry_id", "field1", "field2", "field3", "field4",
+    "field5", "field6", "field7", "field8"
+)
+
+
+def _to_telemetry_response(data: Dict[str, Any]) -> TelemetryResponse:
+    """Build a TelemetryResponse from a raw ThingSpeak feed entry."""
+    return TelemetryResponse(
+        timestamp=data.get("created_at", ""),
+        data={key: data.get(key) for key in _TELEMETRY_KEYS}
     )
-    device = result.scalar_one_or_none()
+
+
+async def _get_channel_config(db: AsyncSession, device_id: str, user_id: str) -> Tuple[str, Optional[str]]:
+    """
+    Resolve a device's ThingSpeak channel and read key for the given user.
     
-    if not device:
+    Rows are cached per device (invalidated on device update/delete), so
+    repeated telemetry polls go straight to ThingSpeak without a DB round-trip.
+    Ownership is checked against the cached owner on every call.
+    
+    Raises:
+        HTTPException: 404 if not found / not owned, 400 if no channel configured
+    """
+    cache_key = device_channel_cache_key(device_id)
+    config = channel_config_cache.get(cache_key)
+    
+    if config is None:
+        result = await db.execute(
+            select(Device.user_id, Device.thingspeak_channel_id, Device.thingspeak_read_key)
+            .where(Device.id == device_id)
+            .limit(1)
+        )
+        config = result.one_or_none()
+        if config is not None:
+            config = tuple(config)
+            channel_config_cache.set(cache_key, config)
+    
+    if config is None or config[0] != user_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Device not found"
         )
     
-    if not device.thingspeak_channel_id:
+    _, channel_id, read_key = config
+    if not channel_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Device has no ThingSpeak channel configured"
         )
     
+    return channel_id, read_key
+
+
+@api_router.get("/devices/{device_id}/telemetry/latest", response_model=TelemetryResponse, tags=["telemetry"])
+async def get_latest_telemetry(
+    device_id: DeviceId,
+    user_payload: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get latest telemetry data from ThingSpeak for a device.
+    
+    Device must have thingspeak_channel_id configured.
+    last_seen is updated asynchronously (within LAST_SEEN_FLUSH_INTERVAL).
+    """
+    user_id = get_user_id(user_payload)
+    channel_id, read_key = await _get_channel_config(db, device_id, user_id)
+    
     # Fetch from ThingSpeak
     thingspeak = get_thingspeak_client()
-    data = await thingspeak.get_latest(
-        device.thingspeak_channel_id,
-        device.thingspeak_read_key
-    )
+    data = await thingspeak.get_latest(channel_id, read_key)
     
     if not data:
         raise HTTPException(
@@ -1067,29 +1359,65 @@ async def get_latest_telemetry(
             detail="Failed to fetch data from ThingSpeak"
         )
     
-    # Update last_seen
-    device.last_seen = datetime.utcnow()
-    await db.commit()
+    # Update last_seen (buffered, flushed in the background)
+    _mark_last_seen(device_id)
     
-    return TelemetryResponse(
-        timestamp=data.get("created_at", ""),
-        data={
-            "entry_id": data.get("entry_id"),
-            "field1": data.get("field1"),
-            "field2": data.get("field2"),
-            "field3": data.get("field3"),
-            "field4": data.get("field4"),
-            "field5": data.get("field5"),
-            "field6": data.get("field6"),
-            "field7": data.get("field7"),
-            "field8": data.get("field8"),
-        }
+    return _to_telemetry_response(data)
+
+
+@api_router.post("/telemetry/latest/batch", response_model=Dict[str, TelemetryResponse], tags=["telemetry"])
+async def get_latest_telemetry_batch(
+    batch: TelemetryBatchRequest,
+    user_payload: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get latest telemetry for multiple devices in one request.
+    
+    Loads all requested devices in a single query and fetches their
+    ThingSpeak channels concurrently. Devices that are not found, have no
+    channel configured, or whose fetch failed are omitted from the result.
+    
+    Returns:
+        dict: {device_id: TelemetryResponse}
+    """
+    user_id = get_user_id(user_payload)
+    
+    # Malformed ids cannot match a device; drop them before querying
+    device_ids = {device_id for device_id in batch.device_ids if _UUID_RE.match(device_id)}
+    if not device_ids:
+        return {}
+    
+    result = await db.execute(
+        select(Device.id, Device.thingspeak_channel_id, Device.thingspeak_read_key).where(
+            Device.id.in_(device_ids),
+            Device.user_id == user_id,
+            Device.thingspeak_channel_id.isnot(None)
+        )
     )
+    devices = result.all()
+    
+    # Fan out ThingSpeak fetches concurrently (client caches per channel)
+    thingspeak = get_thingspeak_client()
+    readings = await asyncio.gather(*[
+        thingspeak.get_latest(device.thingspeak_channel_id, device.thingspeak_read_key)
+        for device in devices
+    ])
+    
+    telemetry = {
+        device.id: _to_telemetry_response(data)
+        for device, data in zip(devices, readings)
+        if data
+    }
+    
+    _mark_last_seen(*telemetry)
+    
+    return telemetry
 
 
 @api_router.get("/devices/{device_id}/telemetry/history", tags=["telemetry"])
 async def get_telemetry_history(
-    device_id: str,
+    device_id: DeviceId,
     results: int = 100,
     user_payload: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -1101,30 +1429,13 @@ async def get_telemetry_history(
         results: Number of data points to fetch (default 100, max 8000)
     """
     user_id = get_user_id(user_payload)
-    
-    # Get device
-    result = await db.execute(
-        select(Device).where(Device.id == device_id, Device.user_id == user_id)
-    )
-    device = result.scalar_one_or_none()
-    
-    if not device:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Device not found"
-        )
-    
-    if not device.thingspeak_channel_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Device has no ThingSpeak channel configured"
-        )
+    channel_id, read_key = await _get_channel_config(db, device_id, user_id)
     
     # Fetch from ThingSpeak
     thingspeak = get_thingspeak_client()
     data = await thingspeak.get_history(
-        device.thingspeak_channel_id,
-        device.thingspeak_read_key,
+        channel_id,
+        read_key,
         results=min(results, 8000)  # Cap at ThingSpeak max
     )
     
@@ -1155,18 +1466,19 @@ if settings.ENVIRONMENT == "development":
     async def debug_db_status(db: AsyncSession = Depends(get_db)):
         """Check database connection and table status."""
         try:
-            # Test connection
-            await db.execute(text("SELECT 1"))
-            
-            # Count records
-            user_count = await db.execute(text("SELECT COUNT(*) FROM users"))
-            device_count = await db.execute(text("SELECT COUNT(*) FROM devices"))
+            # Test connection and count records in a single round-trip
+            # (one AsyncSession cannot run statements concurrently)
+            result = await db.execute(text(
+                "SELECT (SELECT COUNT(*) FROM users) AS users, "
+                "(SELECT COUNT(*) FROM devices) AS devices"
+            ))
+            counts = result.one()
             
             return {
                 "status": "ok",
                 "tables": {
-                    "users": user_count.scalar(),
-                    "devices": device_count.scalar()
+                    "users": counts.users,
+                    "devices": counts.devices
                 }
             }
         except Exception as e:
@@ -1178,18 +1490,21 @@ if settings.ENVIRONMENT == "development":
     @app.get("/debug/performance", tags=["debug"])
     async def debug_performance():
         """Get performance metrics and identify slow queries/endpoints."""
-        report = get_performance_report()
-        
         # Add slow query/endpoint analysis
         slow_queries = await check_slow_queries(threshold_ms=500)
         slow_endpoints = await check_slow_endpoints(threshold_ms=1000)
         
-        report["analysis"] = {
-            "slow_queries": slow_queries[:10],  # Top 10 slowest
-            "slow_endpoints": slow_endpoints[:10]
+        # Copy: the report is shared by callers within its TTL
+        report = {
+            **get_performance_report(),
+            "analysis": {
+                "slow_queries": slow_queries[:10],  # Top 10 slowest
+                "slow_endpoints": slow_endpoints[:10]
+            }
         }
         
-        return report
+        # orjson serializes the numpy-backed metrics natively
+        return ORJSONResponse(report)
 
 
 # ============================================================================
@@ -1202,5 +1517,9 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        reload=True,
+        loop="auto",  # uvloop/httptools when installed (not on Windows); Dockerfile CMDs pin them
+        http="auto",
+        access_log=False,  # ObservabilityMiddleware already logs requests
+        limit_concurrency=settings.MAX_INFLIGHT  # Backpressure before overload
     )
@@ -0,0 +1,134 @@
+"""
+Pure ASGI middleware.
+Request logging, metrics and rate limiting in a single pass, without
+BaseHTTPMiddleware's per-request task and Request/Response materialization.
+"""
+import logging
+import random
+import time
+import uuid
+from typing import Dict, Optional
+
+import orjson
+
+from logger import RequestLogger
+from performance import metrics
+from rate_limit import ProxyNetworks, RateLimiter, get_client_ip
+
+
+class ObservabilityMiddleware:
+    """
+    Rate limit, time, log and record metrics for every HTTP request.
+    
+    - Requests under a rate-limited path prefix that exceed the per-IP limit
+      get a prebuilt 429 (still logged and counted like any other response).
+      Clients are keyed by peer address, or by X-Forwarded-For only when the
+      peer is in trusted_proxies.
+    - Errors (>= 400) are always logged; successful requests are sampled
+      at sample_rate.
+    - Paths in skip_paths (health checks, metrics scrapes) bypass the
+      middleware entirely - no timing, logging or metrics.
+    """
+    
+    DEFAULT_SKIP_PATHS = frozenset({"/", "/health", "/metrics"})
+    
+    # Prebuilt 429 response messages (sent as-is, no Response object)
+    _RATE_LIMITED_BODY = orjson.dumps({"detail": "Rate limit exceeded. Try again later."})
+    _RATE_LIMITED_START = {
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(_RATE_LIMITED_BODY)).encode()),
+            (b"retry-after", b"60")
+        ]
+    }
+    _RATE_LIMITED_MESSAGE = {"type": "http.response.body", "body": _RATE_LIMITED_BODY}
+    
+    def __init__(
+        self,
+        app,
+        logger: logging.Logger,
+        rate_limits: Optional[Dict[str, RateLimiter]] = None,
+        sample_rate: float = 1.0,
+        skip_paths=DEFAULT_SKIP_PATHS,
+        trusted_proxies: ProxyNetworks = ()
+    ):
+        self.app = app
+        self.logger = logger
+        self.rate_limits = rate_limits or {}  # {path prefix: limiter}
+        self.sample_rate = sample_rate
+        self.skip_paths = frozenset(skip_paths)
+        self.trusted_proxies = trusted_proxies
+    
+    def _is_rate_limited(self, scope, path: str) -> bool:
+        """Check (and count) the request against its path prefix's limiter."""
+        for prefix, limiter in self.rate_limits.items():
+            if path.startswith(prefix):
+                return not limiter.is_allowed(get_client_ip(scope, self.trusted_proxies))
+        return False
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        request_id = uuid.uuid4().hex[:8]
+        start_ns = time.perf_counter_ns()  # Monotonic, no float clock math until the end
+        path = scope["path"]
+        
+        # Create request-scoped logger, attached to request.state for endpoints
+        req_logger = RequestLogger(
+            self.logger,
+            request_id=request_id,
+            method=scope["method"],
+            path=path
+        )
+        scope.setdefault("state", {})["logger"] = req_logger
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = round((time.perf_counter_ns() - start_ns) / 1_000_000, 2)
+                
+                # Log errors always, successful requests only when sampled
+                if status_code >= 400 or random.random() < self.sample_rate:
+                    req_logger.info(
+                        "Request completed",
+                        status_code=status_code,
+                        duration_ms=process_time
+                    )
+                
+                # Record performance metrics
+                metrics.record_api_request(
+                    endpoint=path,
+                    duration_ms=process_time,
+                    status_code=status_code
+                )
+                
+                # Add custom headers (copy: the prebuilt 429 messages are shared)
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", ()),
+                        (b"x-request-id", request_id.encode()),
+                        (b"x-process-time", str(process_time).encode())
+                    ]
+                }
+            await send(message)
+        
+        try:
+            if self._is_rate_limited(scope, path):
+                await send_wrapper(self._RATE_LIMITED_START)
+                await send_wrapper(self._RATE_LIMITED_MESSAGE)
+                return
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            process_time = round((time.perf_counter_ns() - start_ns) / 1_000_000, 2)
+            req_logger.error(
+                "Request failed",
+                error=str(e),
+                error_type=type(e).__name__,
+                duration_ms=process_time
+            )
+            raise
@@ -1,10 +1,11 @@
 ﻿import asyncio
+from pathlib import Path
 from sqlalchemy import text
 from database import engine
 
 async def run():
     async with engine.begin() as conn:
-        sql = open('migrations/003_devices_map_upgrade.sql').read()
+        sql = Path('migrations/003_devices_map_upgrade.sql').read_bytes().decode('utf-8')
         await conn.execute(text(sql))
     print("Migration complete")
 
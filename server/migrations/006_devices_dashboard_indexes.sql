@@ -0,0 +1,32 @@
+-- ============================================================================
+-- MIGRATION 006: DEVICES DASHBOARD INDEXES
+-- ============================================================================
+-- Purpose: Composite indexes for per-user dashboard and telemetry lookups
+-- Author: System Architect
+-- Date: 2026-10-15
+-- Requirements: Index-only scans for dashboard counts
+-- ============================================================================
+
+-- Step 1: Composite index for dashboard stats
+-- Used by: GET /dashboard/stats (COUNT by user_id, and by user_id + status)
+-- Replaces index-then-filter on idx_devices_user_id with an index-only scan
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_devices_user_status
+    ON devices(user_id, status);
+
+-- Step 2: Composite index for per-user telemetry lookups
+-- Used by: telemetry endpoints resolving a user's ThingSpeak channels
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_devices_user_channel
+    ON devices(user_id, thingspeak_channel_id);
+
+-- Step 3: Verify index usage (run manually)
+-- EXPLAIN (ANALYZE, BUFFERS)
+-- SELECT COUNT(id) FROM devices WHERE user_id = '<user-id>' AND status = 'online';
+-- Expected: Index Only Scan using idx_devices_user_status
+
+-- ============================================================================
+-- MIGRATION COMPLETE
+-- ============================================================================
+-- Note: CREATE INDEX CONCURRENTLY cannot run inside a transaction block;
+-- run with autocommit: psql -f, or
+--   python run_migration.py migrations/006_devices_dashboard_indexes.sql
+-- ============================================================================
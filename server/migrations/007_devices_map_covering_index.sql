@@ -0,0 +1,42 @@
+-- ============================================================================
+-- MIGRATION 007: COVERING INDEX FOR MAP DEVICES QUERY
+-- ============================================================================
+-- Purpose: Index-only scan for GET /devices/map/all (filter + ORDER BY)
+-- Author: System Architect
+-- Date: 2026-10-15
+-- Requirements: Map query without seq-scan or sort
+-- ============================================================================
+
+-- Step 1: Partial covering index matching the map query shape
+-- Query: WHERE is_active = 'true' AND latitude IS NOT NULL AND longitude IS NOT NULL
+--        ORDER BY asset_type, name
+-- Key columns follow the ORDER BY so rows come back pre-sorted; INCLUDE
+-- carries every selected column so the heap is never read.
+-- Note: devices.is_active is a string column ('true'/'false', Device.is_active
+-- in models.py). The predicate must use the same string literal as the map
+-- query (which inlines 'true' rather than binding it) for the planner to
+-- prove the partial index applies.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_devices_map_sorted
+    ON devices(asset_type, name)
+    INCLUDE (id, asset_category, latitude, longitude, capacity, specifications, status)
+    WHERE is_active = 'true' AND latitude IS NOT NULL AND longitude IS NOT NULL;
+
+-- Step 2: Drop the superseded map index from migration 003
+-- idx_devices_map_active leads with id, so it cannot serve the ORDER BY
+DROP INDEX CONCURRENTLY IF EXISTS idx_devices_map_active;
+
+-- Step 3: Verify index usage (run manually)
+-- EXPLAIN (ANALYZE, BUFFERS)
+-- SELECT id, name, asset_type, asset_category, latitude, longitude, capacity, specifications, status
+-- FROM devices
+-- WHERE is_active = 'true' AND latitude IS NOT NULL AND longitude IS NOT NULL
+-- ORDER BY asset_type, name;
+-- Expected: Index Only Scan using idx_devices_map_sorted (no Sort node)
+
+-- ============================================================================
+-- MIGRATION COMPLETE
+-- ============================================================================
+-- Note: CONCURRENTLY operations cannot run inside a transaction block;
+-- run with autocommit: psql -f, or
+--   python run_migration.py migrations/007_devices_map_covering_index.sql
+-- ============================================================================
@@ -0,0 +1,18 @@
+-- ============================================================================
+-- MIGRATION 008: DATABASE-SIDE DEFAULT FOR devices.id
+-- ============================================================================
+-- Purpose: Let Postgres generate device ids for inserts that omit them
+-- Author: System Architect
+-- Date: 2026-10-15
+-- Requirements: gen_random_uuid() (built in since PostgreSQL 13 / pgcrypto)
+-- ============================================================================
+
+-- Step 1: Default devices.id to a random UUID (stored as text)
+-- Raw SQL inserts (seed scripts, SQL editor) no longer need to supply an id.
+-- The ORM keeps its Python-side default so SQLite test databases still work.
+ALTER TABLE devices
+    ALTER COLUMN id SET DEFAULT gen_random_uuid()::text;
+
+-- ============================================================================
+-- MIGRATION COMPLETE
+-- ============================================================================
@@ -0,0 +1,33 @@
+-- ============================================================================
+-- MIGRATION 009: SQL-SIDE COORDINATE SWAP FOR PIPELINE POLYLINES
+-- ============================================================================
+-- Purpose: Return React-Leaflet [lat, lng] positions straight from Postgres
+-- Author: System Architect
+-- Date: 2026-10-15
+-- Requirements: GET /pipelines without per-point work in Python
+-- ============================================================================
+
+-- Step 1: Swap GeoJSON [lng, lat] pairs to Leaflet [lat, lng] pairs
+-- WITH ORDINALITY keeps the polyline point order stable.
+-- Declared IMMUTABLE so it can also back an index or generated column later.
+CREATE OR REPLACE FUNCTION leaflet_positions(coords JSONB)
+RETURNS JSONB
+LANGUAGE SQL
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+    SELECT COALESCE(
+        jsonb_agg(jsonb_build_array(point -> 1, point -> 0) ORDER BY ord),
+        '[]'::jsonb
+    )
+    FROM jsonb_array_elements(coords) WITH ORDINALITY AS t(point, ord)
+$$;
+
+COMMENT ON FUNCTION leaflet_positions(JSONB) IS 'Convert GeoJSON [lng, lat] pairs to React-Leaflet [lat, lng] pairs';
+
+-- Step 2: Verify (run manually)
+-- SELECT name, coordinates, leaflet_positions(coordinates) FROM pipelines LIMIT 5;
+
+-- ============================================================================
+-- MIGRATION COMPLETE
+-- ============================================================================
@@ -0,0 +1,28 @@
+-- ============================================================================
+-- MIGRATION 010: SERVER-SIDE TIMESTAMP DEFAULTS
+-- ============================================================================
+-- Purpose: Let Postgres fill created_at / updated_at instead of the application
+-- Author: System Architect
+-- Date: 2026-10-15
+-- Requirements: Models use server_default=func.now() / onupdate=func.now()
+-- ============================================================================
+
+-- Step 1: created_at defaults (inserts no longer send a timestamp parameter)
+ALTER TABLE regions         ALTER COLUMN created_at SET DEFAULT NOW();
+ALTER TABLE communities     ALTER COLUMN created_at SET DEFAULT NOW();
+ALTER TABLE users           ALTER COLUMN created_at SET DEFAULT NOW();
+ALTER TABLE devices         ALTER COLUMN created_at SET DEFAULT NOW();
+ALTER TABLE audit_logs      ALTER COLUMN created_at SET DEFAULT NOW();
+ALTER TABLE frontend_errors ALTER COLUMN created_at SET DEFAULT NOW();
+ALTER TABLE pipelines       ALTER COLUMN created_at SET DEFAULT NOW();
+
+-- Step 2: updated_at defaults (UPDATEs set updated_at = now() in the statement)
+ALTER TABLE regions         ALTER COLUMN updated_at SET DEFAULT NOW();
+ALTER TABLE communities     ALTER COLUMN updated_at SET DEFAULT NOW();
+ALTER TABLE users           ALTER COLUMN updated_at SET DEFAULT NOW();
+ALTER TABLE devices         ALTER COLUMN updated_at SET DEFAULT NOW();
+ALTER TABLE pipelines       ALTER COLUMN updated_at SET DEFAULT NOW();
+
+-- ============================================================================
+-- MIGRATION COMPLETE
+-- ============================================================================
@@ -0,0 +1,40 @@
+-- ============================================================================
+-- MIGRATION 011: NATIVE UUID TYPE FOR DEVICE IDS
+-- ============================================================================
+-- Purpose: Store devices.id (and pipeline references to it) as 16-byte UUIDs
+-- Author: System Architect
+-- Date: 2026-10-15
+-- Requirements: All existing devices.id values are UUID strings
+-- ============================================================================
+
+-- Note: users.id / user_id columns stay TEXT - dev-bypass and test identities
+-- ("dev-bypass-id-{email}") are not UUIDs.
+
+BEGIN;
+
+-- Step 1: Drop foreign keys that pin the column type
+ALTER TABLE pipelines DROP CONSTRAINT IF EXISTS pipelines_from_device_id_fkey;
+ALTER TABLE pipelines DROP CONSTRAINT IF EXISTS pipelines_to_device_id_fkey;
+
+-- Step 2: Convert devices.id (VARCHAR -> UUID), keeping a DB-side default
+ALTER TABLE devices ALTER COLUMN id DROP DEFAULT;
+ALTER TABLE devices ALTER COLUMN id TYPE UUID USING id::uuid;
+ALTER TABLE devices ALTER COLUMN id SET DEFAULT gen_random_uuid();
+
+-- Step 3: Convert the referencing columns
+ALTER TABLE pipelines ALTER COLUMN from_device_id TYPE UUID USING from_device_id::uuid;
+ALTER TABLE pipelines ALTER COLUMN to_device_id TYPE UUID USING to_device_id::uuid;
+
+-- Step 4: Restore foreign keys
+ALTER TABLE pipelines
+    ADD CONSTRAINT pipelines_from_device_id_fkey
+    FOREIGN KEY (from_device_id) REFERENCES devices(id) ON DELETE SET NULL;
+ALTER TABLE pipelines
+    ADD CONSTRAINT pipelines_to_device_id_fkey
+    FOREIGN KEY (to_device_id) REFERENCES devices(id) ON DELETE SET NULL;
+
+COMMIT;
+
+-- ============================================================================
+-- MIGRATION COMPLETE
+-- ============================================================================
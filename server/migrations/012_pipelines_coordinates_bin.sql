@@ -0,0 +1,43 @@
+-- ============================================================================
+-- MIGRATION 012: PACKED BINARY PIPELINE COORDINATES
+-- ============================================================================
+-- Purpose: Store pipeline polylines as float32 pairs (8 bytes/point) next to the JSONB
+-- Author: System Architect
+-- Date: 2026-10-15
+-- Requirements: GET /pipelines decodes points with a memcpy instead of a JSON parse
+-- ============================================================================
+
+-- Step 1: Add the packed column
+-- Layout: consecutive big-endian float32 (lng, lat) pairs, matching
+-- models.encode_coordinates(). NULL means "not packed yet"; the API then
+-- falls back to leaflet_positions(coordinates).
+ALTER TABLE pipelines ADD COLUMN IF NOT EXISTS coordinates_bin BYTEA;
+
+COMMENT ON COLUMN pipelines.coordinates_bin IS 'Polyline as big-endian float32 [lng, lat] pairs (8 bytes/point)';
+
+-- Step 2: Backfill from the JSONB column
+-- float4send() emits network byte order, which is why the format is big-endian.
+-- WITH ORDINALITY keeps the polyline point order stable.
+UPDATE pipelines p
+SET coordinates_bin = (
+    SELECT COALESCE(
+        string_agg(
+            float4send((point ->> 0)::float4) || float4send((point ->> 1)::float4),
+            ''::bytea
+            ORDER BY ord
+        ),
+        ''::bytea
+    )
+    FROM jsonb_array_elements(p.coordinates) WITH ORDINALITY AS t(point, ord)
+)
+WHERE p.coordinates_bin IS NULL;
+
+-- Step 3: Verify (run manually)
+-- Every row should be packed, at 8 bytes per point:
+-- SELECT name, jsonb_array_length(coordinates) * 8 AS expected, length(coordinates_bin) AS actual
+-- FROM pipelines
+-- WHERE coordinates_bin IS NULL OR length(coordinates_bin) <> jsonb_array_length(coordinates) * 8;
+
+-- ============================================================================
+-- MIGRATION COMPLETE
+-- ============================================================================
@@ -0,0 +1,59 @@
+-- ============================================================================
+-- MIGRATION 013: UNIQUE KEYS FOR SEEDED ROWS
+-- ============================================================================
+-- Purpose: Unique B-tree indexes on the natural keys the seed scripts match on
+-- Author: System Architect
+-- Date: 2026-10-15
+-- Requirements: No duplicate pipelines.name values (see Step 1)
+-- ============================================================================
+
+-- Step 1: Check for duplicate pipeline names (run manually first)
+-- The unique index build fails if any remain; resolve them before running.
+-- SELECT name, COUNT(*) FROM pipelines GROUP BY name HAVING COUNT(*) > 1;
+
+-- Step 2: devices.node_key
+-- The devices table is created from models.py, where Device.node_key is
+-- unique=True, index=True: that already builds the unique index
+-- ix_devices_node_key. Only build one when no single-column, non-partial
+-- unique index covers node_key, so model-built databases keep just the one.
+-- seed_map_devices.py's ON CONFLICT (node_key) upsert uses it as its arbiter.
+-- (Plain CREATE INDEX: CONCURRENTLY is not allowed inside a DO block; the
+-- build only happens on databases that are missing the index entirely.)
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+        WHERE i.indrelid = 'devices'::regclass
+          AND i.indisunique
+          AND i.indnkeyatts = 1
+          AND i.indpred IS NULL
+          AND a.attname = 'node_key'
+    ) THEN
+        CREATE UNIQUE INDEX devices_node_key_key ON devices(node_key);
+    END IF;
+END $$;
+
+-- Step 3: pipelines.name
+-- seed_pipelines.py matches existing rows with name = ANY(:names) and
+-- updates them by name; this turns both into unique index probes.
+-- pipelines comes from migration 004 (no unique key). Pipeline.name is
+-- unique=True in models.py, which create_all names pipelines_name_key too,
+-- so IF NOT EXISTS skips model-built databases.
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS pipelines_name_key
+    ON pipelines(name);
+
+-- Step 4: Verify (run manually)
+-- Expect exactly one unique index per table on the seed key:
+-- SELECT tablename, indexname, indexdef FROM pg_indexes
+-- WHERE (tablename = 'devices' AND indexdef LIKE '%(node_key)%')
+--    OR (tablename = 'pipelines' AND indexdef LIKE '%(name)%');
+
+-- ============================================================================
+-- MIGRATION COMPLETE
+-- ============================================================================
+-- Note: CONCURRENTLY operations cannot run inside a transaction block;
+-- run with autocommit: psql -f, or
+--   python run_migration.py migrations/013_seed_unique_keys.sql
+-- ============================================================================
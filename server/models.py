@@ -2,26 +2,69 @@
 Database models - simplified and clean.
 Only essential tables: users and devices.
 """
-from sqlalchemy import Column, String, Float, DateTime, JSON, Boolean
+from sqlalchemy import Column, String, Float, DateTime, JSON, Boolean, Index, LargeBinary, Uuid, and_, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import validates
 from database import Base
-from datetime import datetime
+import numpy as np
+import os
+import time
 import uuid
 
 
+def uuid7() -> str:
+    """
+    Time-ordered UUID (RFC 9562 version 7) as a string.
+    48-bit Unix millisecond timestamp followed by random bits, so keys
+    created later sort later and append to the right edge of a B-tree index.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122/9562 variant
+    return str(uuid.UUID(int=value))
+
+
+# Packed polyline format for pipelines.coordinates_bin: consecutive float32
+# (lng, lat) pairs, 8 bytes per point. Big-endian so the bytes match
+# Postgres float4send(), which migration 012 uses to backfill in SQL.
+COORDINATES_DTYPE = np.dtype(">f4")
+
+
+def encode_coordinates(coords) -> bytes:
+    """Pack [[lng, lat], ...] into coordinates_bin bytes."""
+    return np.asarray(coords, dtype=COORDINATES_DTYPE).tobytes()
+
+
+def decode_coordinates(data: bytes) -> np.ndarray:
+    """Unpack coordinates_bin bytes into an (N, 2) array of [lng, lat] rows (zero-copy)."""
+    return np.frombuffer(data, dtype=COORDINATES_DTYPE).reshape(-1, 2)
+
+
+def decode_leaflet_positions(data: bytes) -> list:
+    """
+    Unpack coordinates_bin into React-Leaflet [[lat, lng], ...] lists.
+    Rounded to 6 decimals (~0.1 m, finer than float32 keeps at these
+    magnitudes) so the JSON carries no float32 widening noise.
+    """
+    return decode_coordinates(data)[:, ::-1].astype(np.float64).round(6).tolist()
+
+
 class Region(Base):
     """Geographic regions (cities) for organizing communities."""
     __tablename__ = "regions"
+    __mapper_args__ = {"eager_defaults": True}  # Fetch DB-generated timestamps via RETURNING
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, unique=True, nullable=False, index=True)
     state = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
 
 class Community(Base):
     """Communities within regions where devices are deployed."""
     __tablename__ = "communities"
+    __mapper_args__ = {"eager_defaults": True}  # Fetch DB-generated timestamps via RETURNING
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, nullable=False)
@@ -29,28 +72,31 @@ class Community(Base):
     address = Column(String, nullable=True)
     contact_email = Column(String, nullable=True)
     contact_phone = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
 
 class User(Base):
     """User profile synchronized from Supabase Auth."""
     __tablename__ = "users"
+    __mapper_args__ = {"eager_defaults": True}  # Fetch DB-generated timestamps via RETURNING
     
     id = Column(String, primary_key=True)  # Supabase UUID
     email = Column(String, unique=True, nullable=False, index=True)
     display_name = Column(String, nullable=True)
     role = Column(String, default="customer")  # customer, distributor, superadmin
     community_id = Column(String, nullable=True, index=True)  # References Community.id
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
 
 class Device(Base):
     """IoT Device/Node with ThingSpeak integration and map display."""
     __tablename__ = "devices"
+    __mapper_args__ = {"eager_defaults": True}  # Fetch DB-generated timestamps via RETURNING
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    # Native UUID on PostgreSQL (16 bytes), exposed to the app as a string
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
     node_key = Column(String, unique=True, nullable=False, index=True)
     label = Column(String, nullable=False)
     
@@ -90,7 +136,7 @@ class Device(Base):
     thingspeak_channel_id = Column(String, nullable=True)
     thingspeak_read_key = Column(String, nullable=True)
     thingspeak_write_key = Column(String, nullable=True)
-    field_mapping = Column(JSON, default={})  # {"field1": "water_level", "field2": "temperature"}
+    field_mapping = Column(JSON, default=dict)  # {"field1": "water_level", "field2": "temperature"} (fresh dict per row)
     
     # Community Link
     community_id = Column(String, nullable=True, index=True)  # References Community.id
@@ -99,9 +145,19 @@ class Device(Base):
     user_id = Column(String, nullable=False, index=True)  # Owner (references User.id)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     last_seen = Column(DateTime, nullable=True)
+    
+    # Composite indexes (see migrations 003 and 006)
+    __table_args__ = (
+        Index("idx_devices_user_status", "user_id", "status"),  # Dashboard stats counts
+        Index("idx_devices_user_channel", "user_id", "thingspeak_channel_id"),  # Telemetry lookups
+        Index(
+            "idx_devices_lat_lng", "latitude", "longitude",  # Bounding-box range scans
+            postgresql_where=and_(latitude.isnot(None), longitude.isnot(None))
+        ),
+    )
 
 
 class AuditLog(Base):
@@ -114,7 +170,7 @@ class AuditLog(Base):
     resource_type = Column(String, nullable=False)  # device, user, pipeline, etc.
     resource_id = Column(String, nullable=True)  # ID of affected resource
     details = Column(JSON, nullable=True)  # Additional context
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
 
 
 class FrontendError(Base):
@@ -127,23 +183,27 @@ class FrontendError(Base):
     url = Column(String, nullable=False)
     user_agent = Column(String, nullable=True)
     user_id = Column(String, nullable=True, index=True)  # Optional: if available
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
 
 
 class Pipeline(Base):
     """Water distribution pipelines for map visualization."""
     __tablename__ = "pipelines"
+    __mapper_args__ = {"eager_defaults": True}  # Fetch DB-generated timestamps via RETURNING
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    name = Column(String, nullable=False)
+    name = Column(String, unique=True, nullable=False)  # Natural key for seeding (migration 013)
     pipeline_type = Column(String, nullable=False)  # 'water_supply', 'borewell_water'
     
     # Device relationships (optional)
-    from_device_id = Column(String, nullable=True)
-    to_device_id = Column(String, nullable=True)
+    from_device_id = Column(Uuid(as_uuid=False), nullable=True)  # References Device.id
+    to_device_id = Column(Uuid(as_uuid=False), nullable=True)  # References Device.id
     
     # Geographic data: array of [lng, lat] pairs for polyline
-    coordinates = Column(JSON, nullable=False)
+    # JSONB on PostgreSQL (matches migration 004: binary storage, no re-parse)
+    coordinates = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    # Same polyline packed as float32 pairs (see encode_coordinates); read path for the map
+    coordinates_bin = Column(LargeBinary, nullable=True)
     
     # Pipeline specifications
     diameter = Column(String, nullable=True)
@@ -159,7 +219,13 @@ class Pipeline(Base):
     
     # Metadata
     description = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     created_by = Column(String, nullable=True)
+    
+    @validates("coordinates")
+    def _sync_coordinates_bin(self, key, value):
+        """Keep coordinates_bin in step with coordinates on ORM writes."""
+        self.coordinates_bin = encode_coordinates(value) if value is not None else None
+        return value
 
@@ -2,42 +2,180 @@
 Performance monitoring utilities for backend
 Tracks API response times, database query performance, and resource usage
 """
+import sys
 import time
+import heapq
 import asyncio
+from dataclasses import dataclass
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
-from collections import deque
 from functools import wraps
+import numpy as np
 import psutil
 
+from config import get_settings
+from logger import get_log_queue_stats
+
 # ============================================================================
 # PERFORMANCE METRICS TRACKER
 # ============================================================================
 
+@dataclass(slots=True)
+class RequestRecord:
+    """One recorded API request, materialized for reports (orjson-serializable)."""
+    endpoint: str
+    duration_ms: float
+    status_code: int
+    timestamp: str
+
+
+@dataclass(slots=True)
+class QueryRecord:
+    """One recorded database query, materialized for reports (orjson-serializable)."""
+    query_type: str
+    duration_ms: float
+    timestamp: str
+
+
+class SampleRing:
+    """
+    Fixed-capacity ring buffer of timing samples stored column-wise (SoA).
+    Each sample is a duration, an interned label id, a status code and an
+    epoch timestamp held in preallocated numpy arrays - no per-sample objects.
+    
+    Samples at or above slow_watermark_ms are also indexed in a bounded
+    min-heap as they arrive, so slow-sample lookups read only that index
+    instead of scanning the whole ring.
+    """
+    
+    def __init__(self, capacity: int, slow_watermark_ms: float = float('inf')):
+        self.capacity = capacity
+        self.slow_watermark_ms = slow_watermark_ms
+        self.durations = np.zeros(capacity, dtype=np.float32)
+        self.label_ids = np.zeros(capacity, dtype=np.uint32)
+        self.statuses = np.zeros(capacity, dtype=np.uint16)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.labels: List[str] = []  # {label id: label}
+        self._label_index: Dict[str, int] = {}  # {label: label id}
+        self._cursor = 0
+        self._count = 0
+        self._seq = 0  # Total samples appended since clear (ring position = seq % capacity)
+        self._max_ms = float('-inf')  # Largest duration appended since clear (upper bound for live samples)
+        self._slow_heap: List[tuple] = []  # Min-heap of (duration_ms, seq), at most capacity entries
+        self._slow_evicted_ms = float('-inf')  # Largest duration pushed out of the heap
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def append(self, label: str, duration_ms: float, status_code: int = 0) -> int:
+        """Store one sample, overwriting the oldest once full. Returns the label id."""
+        label_id = self._label_index.get(label)
+        if label_id is None:
+            label = sys.intern(label)  # First sighting only; later lookups reuse it
+            label_id = self._label_index[label] = len(self.labels)
+            self.labels.append(label)
+        
+        i = self._cursor
+        self.durations[i] = duration_ms
+        self.label_ids[i] = label_id
+        self.statuses[i] = status_code
+        self.timestamps[i] = time.time()
+        self._cursor = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        if duration_ms > self._max_ms:
+            self._max_ms = duration_ms
+        
+        if duration_ms >= self.slow_watermark_ms:
+            heapq.heappush(self._slow_heap, (duration_ms, self._seq))
+            if len(self._slow_heap) > self.capacity:
+                evicted_ms = heapq.heappop(self._slow_heap)[0]
+                if evicted_ms > self._slow_evicted_ms:
+                    self._slow_evicted_ms = evicted_ms
+        self._seq += 1
+        return label_id
+    
+    def duration_view(self) -> np.ndarray:
+        """Durations of the live samples (unordered, no copy)."""
+        return self.durations[:self._count]
+    
+    def indices_above(self, threshold: float) -> np.ndarray:
+        """
+        Indices of samples slower than threshold, slowest first.
+        Served from the slow-sample heap when it is known to hold every
+        match (threshold at/above the watermark and nothing relevant evicted);
+        otherwise a vectorized scan of the ring.
+        """
+        if threshold >= self._max_ms:
+            # Empty ring, or nothing ever recorded above threshold (the healthy case)
+            return np.empty(0, dtype=np.intp)
+        
+        if threshold >= self.slow_watermark_ms and threshold >= self._slow_evicted_ms:
+            oldest_live = self._seq - self._count  # Older entries were overwritten in the ring
+            hits = sorted(
+                (entry for entry in self._slow_heap if entry[0] > threshold and entry[1] >= oldest_live),
+                reverse=True
+            )
+            return np.fromiter((seq % self.capacity for _, seq in hits), dtype=np.intp, count=len(hits))
+        
+        durations = self.duration_view()
+        hits = np.flatnonzero(durations > threshold)
+        return hits[np.argsort(-durations[hits], kind='stable')]
+    
+    def iso_timestamps(self, indices: np.ndarray) -> List[str]:
+        """ISO-8601 UTC strings for the samples at indices, formatted in one numpy call."""
+        micros = np.rint(self.timestamps[indices] * 1_000_000).astype(np.int64)
+        return np.datetime_as_string(micros.astype('datetime64[us]')).tolist()
+    
+    def clear(self):
+        self.labels.clear()
+        self._label_index.clear()
+        self._cursor = 0
+        self._count = 0
+        self._seq = 0
+        self._max_ms = float('-inf')
+        self._slow_heap.clear()
+        self._slow_evicted_ms = float('-inf')
+
+
 class PerformanceMetrics:
     """
     Track performance metrics in memory.
     Stores recent data points for analysis.
     """
     
+    SYSTEM_STATS_TTL = 1.0  # seconds
+    
+    # Samples at or above these are indexed for check_slow_* as they are recorded
+    # (the /debug/performance thresholds; lower thresholds fall back to a scan)
+    SLOW_QUERY_WATERMARK_MS = 500
+    SLOW_ENDPOINT_WATERMARK_MS = 1000
+    
     def __init__(self, max_samples: int = 1000):
         self.max_samples = max_samples
-        self.api_response_times: deque = deque(maxlen=max_samples)
-        self.db_query_times: deque = deque(maxlen=max_samples)
+        self._system_stats: Optional[tuple] = None  # (expires_at, stats)
+        self.api_samples = SampleRing(max_samples, self.SLOW_ENDPOINT_WATERMARK_MS)
+        self.db_samples = SampleRing(max_samples, self.SLOW_QUERY_WATERMARK_MS)
         self.error_counts: Dict[str, int] = {}
-        self.endpoint_counts: Dict[str, int] = {}
+        # Hit counts indexed by api_samples label id (grown on demand)
+        self._endpoint_hits = np.zeros(64, dtype=np.int64)
+    
+    @property
+    def endpoint_counts(self) -> Dict[str, int]:
+        """{endpoint: hit count} for every endpoint seen since the last reset."""
+        labels = self.api_samples.labels
+        return dict(zip(labels, self._endpoint_hits[:len(labels)].tolist()))
         
     def record_api_request(self, endpoint: str, duration_ms: float, status_code: int):
         """Record API request metrics."""
-        self.api_response_times.append({
-            'endpoint': endpoint,
-            'duration_ms': duration_ms,
-            'status_code': status_code,
-            'timestamp': datetime.utcnow().isoformat()
-        })
+        label_id = self.api_samples.append(endpoint, duration_ms, status_code)
         
-        # Count endpoint usage
-        self.endpoint_counts[endpoint] = self.endpoint_counts.get(endpoint, 0) + 1
+        # Count endpoint usage (one array increment; the ring already interned the path)
+        if label_id >= len(self._endpoint_hits):
+            self._endpoint_hits = np.concatenate(
+                (self._endpoint_hits, np.zeros(len(self._endpoint_hits), dtype=np.int64))
+            )
+        self._endpoint_hits[label_id] += 1
         
         # Count errors
         if status_code >= 400:
@@ -46,15 +184,34 @@ class PerformanceMetrics:
     
     def record_db_query(self, query_type: str, duration_ms: float):
         """Record database query metrics."""
-        self.db_query_times.append({
-            'query_type': query_type,
-            'duration_ms': duration_ms,
-            'timestamp': datetime.utcnow().isoformat()
-        })
+        self.db_samples.append(query_type, duration_ms)
+    
+    def api_records(self, indices=None):
+        """Yield recorded API requests as RequestRecords (for reports), optionally only at indices."""
+        samples = self.api_samples
+        indices = np.arange(len(samples)) if indices is None else indices
+        for i, timestamp in zip(indices, samples.iso_timestamps(indices)):
+            yield RequestRecord(
+                samples.labels[samples.label_ids[i]],
+                round(float(samples.durations[i]), 2),
+                int(samples.statuses[i]),
+                timestamp
+            )
+    
+    def db_records(self, indices=None):
+        """Yield recorded database queries as QueryRecords (for reports), optionally only at indices."""
+        samples = self.db_samples
+        indices = np.arange(len(samples)) if indices is None else indices
+        for i, timestamp in zip(indices, samples.iso_timestamps(indices)):
+            yield QueryRecord(
+                samples.labels[samples.label_ids[i]],
+                round(float(samples.durations[i]), 2),
+                timestamp
+            )
     
     def get_api_stats(self) -> Dict[str, Any]:
         """Get API performance statistics."""
-        if not self.api_response_times:
+        if not len(self.api_samples):
             return {
                 'total_requests': 0,
                 'avg_response_time_ms': 0,
@@ -64,42 +221,52 @@ class PerformanceMetrics:
                 'error_rate': 0
             }
         
-        durations = sorted([r['duration_ms'] for r in self.api_response_times])
+        durations = self.api_samples.duration_view()
         total_requests = len(durations)
         error_count = sum(self.error_counts.values())
+        p50, p95, p99 = self._percentiles(durations, (50, 95, 99))
         
         return {
             'total_requests': total_requests,
-            'avg_response_time_ms': round(sum(durations) / len(durations), 2),
-            'p50_ms': self._percentile(durations, 50),
-            'p95_ms': self._percentile(durations, 95),
-            'p99_ms': self._percentile(durations, 99),
+            'avg_response_time_ms': round(float(durations.mean(dtype=np.float64)), 2),
+            'p50_ms': p50,
+            'p95_ms': p95,
+            'p99_ms': p99,
             'error_rate': round((error_count / total_requests) * 100, 2) if total_requests > 0 else 0,
             'top_endpoints': self._get_top_endpoints(5)
         }
     
     def get_db_stats(self) -> Dict[str, Any]:
         """Get database performance statistics."""
-        if not self.db_query_times:
+        if not len(self.db_samples):
             return {'total_queries': 0}
         
-        durations = sorted([q['duration_ms'] for q in self.db_query_times])
+        durations = self.db_samples.duration_view()
+        p50, p95, p99 = self._percentiles(durations, (50, 95, 99))
         
         return {
             'total_queries': len(durations),
-            'avg_query_time_ms': round(sum(durations) / len(durations), 2),
-            'p50_ms': self._percentile(durations, 50),
-            'p95_ms': self._percentile(durations, 95),
-            'p99_ms': self._percentile(durations, 99)
+            'avg_query_time_ms': round(float(durations.mean(dtype=np.float64)), 2),
+            'p50_ms': p50,
+            'p95_ms': p95,
+            'p99_ms': p99
         }
     
     def get_system_stats(self) -> Dict[str, Any]:
-        """Get system resource usage."""
+        """
+        Get system resource usage.
+        Non-blocking: CPU is measured since the previous call (primed at
+        import) and the result is reused for SYSTEM_STATS_TTL seconds.
+        """
+        now = time.monotonic()
+        if self._system_stats is not None and now < self._system_stats[0]:
+            return self._system_stats[1]
+        
         try:
-            cpu_percent = psutil.cpu_percent(interval=0.1)
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory = psutil.virtual_memory()
             
-            return {
+            stats = {
                 'cpu_percent': round(cpu_percent, 2),
                 'memory_used_mb': round(memory.used / 1024 / 1024, 2),
                 'memory_percent': round(memory.percent, 2),
@@ -107,46 +274,61 @@ class PerformanceMetrics:
             }
         except Exception as e:
             return {'error': str(e)}
+        
+        self._system_stats = (now + self.SYSTEM_STATS_TTL, stats)
+        return stats
     
-    def _percentile(self, data: List[float], percentile: int) -> float:
-        """Calculate percentile from sorted data."""
-        if not data:
-            return 0
-        index = int(len(data) * (percentile / 100))
-        return round(data[min(index, len(data) - 1)], 2)
+    def _percentiles(self, data: np.ndarray, percentiles: tuple) -> List[float]:
+        """
+        Calculate several percentiles from unsorted data.
+        One np.partition call places every requested rank in O(N),
+        instead of a full O(N log N) sort.
+        """
+        if len(data) == 0:
+            return [0 for _ in percentiles]
+        indices = [min(int(len(data) * (percentile / 100)), len(data) - 1) for percentile in percentiles]
+        partitioned = np.partition(data, indices)
+        return [round(float(partitioned[index]), 2) for index in indices]
     
     def _get_top_endpoints(self, limit: int) -> List[Dict[str, Any]]:
         """Get most frequently called endpoints."""
-        sorted_endpoints = sorted(
-            self.endpoint_counts.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:limit]
+        labels = self.api_samples.labels
+        hits = self._endpoint_hits[:len(labels)]
+        top_ids = np.argsort(-hits, kind='stable')[:limit]
         
         return [
-            {'endpoint': endpoint, 'count': count}
-            for endpoint, count in sorted_endpoints
+            {'endpoint': labels[label_id], 'count': int(hits[label_id])}
+            for label_id in top_ids
         ]
     
     def reset(self):
         """Reset all metrics."""
-        self.api_response_times.clear()
-        self.db_query_times.clear()
+        self.api_samples.clear()
+        self.db_samples.clear()
         self.error_counts.clear()
-        self.endpoint_counts.clear()
+        self._endpoint_hits[:] = 0
 
 
 # Global metrics instance
 metrics = PerformanceMetrics()
 
+# Prime psutil's CPU counter so non-blocking cpu_percent() calls are meaningful
+psutil.cpu_percent(interval=None)
+
 
 # ============================================================================
 # PERFORMANCE DECORATORS
 # ============================================================================
 
+# Decorators are specialized once at import: with metrics disabled they
+# return the wrapped function itself, adding no per-call overhead
+METRICS_ENABLED = get_settings().METRICS_ENABLED
+
+
 def track_db_query(query_type: str):
     """
     Decorator to track database query performance.
+    Returns the function unchanged when METRICS_ENABLED is off.
     
     Usage:
     ```python
@@ -157,18 +339,22 @@ def track_db_query(query_type: str):
     ```
     """
     def decorator(func):
+        if not METRICS_ENABLED:
+            return func
+        
+        error_type = f"{query_type}_ERROR"
+        
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_time = time.perf_counter()
+            failed = True
             try:
                 result = await func(*args, **kwargs)
-                duration_ms = round((time.time() - start_time) * 1000, 2)
-                metrics.record_db_query(query_type, duration_ms)
+                failed = False
                 return result
-            except Exception as e:
-                duration_ms = round((time.time() - start_time) * 1000, 2)
-                metrics.record_db_query(f"{query_type}_ERROR", duration_ms)
-                raise
+            finally:
+                duration_ms = (time.perf_counter() - start_time) * 1000  # Rounded at report time
+                metrics.record_db_query(error_type if failed else query_type, duration_ms)
         return wrapper
     return decorator
 
@@ -177,6 +363,7 @@ def track_endpoint_performance(func):
     """
     Decorator to track endpoint performance.
     Automatically extracts endpoint path and status code.
+    Returns the function unchanged when METRICS_ENABLED is off.
     
     Usage:
     ```python
@@ -186,23 +373,23 @@ def track_endpoint_performance(func):
         ...
     ```
     """
+    if not METRICS_ENABLED:
+        return func
+    
+    # Extract endpoint path from function name (once, at decoration time)
+    endpoint = func.__name__
+    
     @wraps(func)
     async def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
+        status_code = 500
         try:
             result = await func(*args, **kwargs)
-            duration_ms = round((time.time() - start_time) * 1000, 2)
-            
-            # Extract endpoint path from function name
-            endpoint = func.__name__
             status_code = 200  # Default success
-            
-            metrics.record_api_request(endpoint, duration_ms, status_code)
             return result
-        except Exception as e:
-            duration_ms = round((time.time() - start_time) * 1000, 2)
-            metrics.record_api_request(func.__name__, duration_ms, 500)
-            raise
+        finally:
+            duration_ms = (time.perf_counter() - start_time) * 1000  # Rounded at report time
+            metrics.record_api_request(endpoint, duration_ms, status_code)
     return wrapper
 
 
@@ -210,22 +397,36 @@ def track_endpoint_performance(func):
 # PERFORMANCE ANALYSIS
 # ============================================================================
 
+REPORT_TTL = 1.0  # seconds
+_report_cache: Optional[tuple] = None  # (expires_at, report)
+
+
 def get_performance_report() -> Dict[str, Any]:
     """
     Generate comprehensive performance report.
+    The report is reused for REPORT_TTL seconds, so dashboards polling in
+    bursts share one computation. Treat the returned dict as read-only.
     
     Returns:
         Dictionary with API stats, DB stats, and system stats
     """
-    return {
+    global _report_cache
+    now = time.monotonic()
+    if _report_cache is not None and now < _report_cache[0]:
+        return _report_cache[1]
+    
+    report = {
         'timestamp': datetime.utcnow().isoformat(),
         'api': metrics.get_api_stats(),
         'database': metrics.get_db_stats(),
-        'system': metrics.get_system_stats()
+        'system': metrics.get_system_stats(),
+        'logging': get_log_queue_stats()
     }
+    _report_cache = (now + REPORT_TTL, report)
+    return report
 
 
-async def check_slow_queries(threshold_ms: float = 1000) -> List[Dict[str, Any]]:
+async def check_slow_queries(threshold_ms: float = 1000) -> List[QueryRecord]:
     """
     Identify slow database queries.
     
@@ -235,16 +436,12 @@ async def check_slow_queries(threshold_ms: float = 1000) -> List[Dict[str, Any]]
     Returns:
         List of slow queries with duration and timestamp
     """
-    slow_queries = []
-    
-    for query in metrics.db_query_times:
-        if query['duration_ms'] > threshold_ms:
-            slow_queries.append(query)
-    
-    return sorted(slow_queries, key=lambda x: x['duration_ms'], reverse=True)
+    # Filter and sort on the duration array; only the hits become dicts
+    slow_indices = metrics.db_samples.indices_above(threshold_ms)
+    return list(metrics.db_records(slow_indices))
 
 
-async def check_slow_endpoints(threshold_ms: float = 2000) -> List[Dict[str, Any]]:
+async def check_slow_endpoints(threshold_ms: float = 2000) -> List[RequestRecord]:
     """
     Identify slow API endpoints.
     
@@ -254,10 +451,6 @@ async def check_slow_endpoints(threshold_ms: float = 2000) -> List[Dict[str, Any
     Returns:
         List of slow endpoints with duration and timestamp
     """
-    slow_endpoints = []
-    
-    for request in metrics.api_response_times:
-        if request['duration_ms'] > threshold_ms:
-            slow_endpoints.append(request)
-    
-    return sorted(slow_endpoints, key=lambda x: x['duration_ms'], reverse=True)
+    # Filter and sort on the duration array; only the hits become dicts
+    slow_indices = metrics.api_samples.indices_above(threshold_ms)
+    return list(metrics.api_records(slow_indices))
@@ -0,0 +1,93 @@
+"""
+In-process rate limiting.
+Per-client request limits for public (unauthenticated) endpoints.
+"""
+import ipaddress
+import time
+from typing import Dict, Tuple, Union
+
+
+class RateLimiter:
+    """
+    Fixed-window rate limiter keyed by client (e.g. IP address).
+    Allows at most `requests_per_minute` requests per key per window.
+    O(1) per check; state only holds counts for the current window.
+    
+    is_allowed() is deliberately synchronous: it never awaits between reading
+    and updating a count, so each check is atomic on the event loop and
+    concurrent requests from one client cannot both slip under the limit.
+    Limits are per worker process; multi-worker deployments would need a
+    shared store (e.g. Redis) to enforce a global quota.
+    """
+    
+    def __init__(self, requests_per_minute: int, window_seconds: float = 60.0):
+        self.requests_per_minute = requests_per_minute
+        self.window_seconds = window_seconds
+        self._window = -1
+        self._counts: Dict[str, int] = {}  # {key: requests in current window}
+    
+    def is_allowed(self, key: str) -> bool:
+        """Record a request for key and return False if it exceeds the limit."""
+        window = int(time.monotonic() // self.window_seconds)
+        if window != self._window:
+            # New window: every previous count is stale, evict them all at once
+            self._window = window
+            self._counts.clear()
+        
+        count = self._counts.get(key, 0)
+        if count >= self.requests_per_minute:
+            return False
+        
+        self._counts[key] = count + 1
+        return True
+    
+    def reset(self):
+        """Clear all tracked clients."""
+        self._counts.clear()
+
+
+ProxyNetworks = Tuple[Union[ipaddress.IPv4Network, ipaddress.IPv6Network], ...]
+
+
+def parse_trusted_proxies(value: str) -> ProxyNetworks:
+    """Parse a comma-separated list of proxy IPs / CIDR ranges (TRUSTED_PROXIES)."""
+    return tuple(
+        ipaddress.ip_network(item.strip(), strict=False)
+        for item in value.split(",")
+        if item.strip()
+    )
+
+
+def _is_trusted(host: str, trusted_proxies: ProxyNetworks) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in trusted_proxies)
+
+
+def get_client_ip(scope, trusted_proxies: ProxyNetworks = ()) -> str:
+    """
+    Client IP from an ASGI scope.
+    
+    X-Forwarded-For is client-controlled, so it is only honoured when the
+    direct peer is one of trusted_proxies. The header is then read right to
+    left, skipping hops appended by our own proxies: the first untrusted hop
+    is the address the outermost proxy saw. Anything a client prepends sits
+    to the left of it and is ignored. Otherwise the peer address is used.
+    """
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    if not trusted_proxies or not _is_trusted(peer, trusted_proxies):
+        return peer
+    
+    # Repeated X-Forwarded-For headers are equivalent to one comma-joined list
+    forwarded = ",".join(
+        value.decode("latin-1") for name, value in scope.get("headers", ())
+        if name == b"x-forwarded-for"
+    )
+    for hop in reversed(forwarded.split(",")):
+        hop = hop.strip()
+        if hop and not _is_trusted(hop, trusted_proxies):
+            return hop
+    return peer
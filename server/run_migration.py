@@ -1,128 +1,212 @@
 """
-Run database migration 005: Regions and Communities
+Run a SQL migration file (default: 005 Regions and Communities).
+
+Usage: python run_migration.py [migrations/NNN_name.sql] [--quiet]
+Statements run in AUTOCOMMIT, so CREATE INDEX CONCURRENTLY migrations work.
 """
 import asyncio
+import os
 import re
+import sys
+from pathlib import Path
 from sqlalchemy import text
 from database import engine
 
 
+MIGRATION_FILE = 'migrations/005_regions_communities.sql'
+
+# Whitespace and whole-line "--" comments between statements
+_LEADING_NOISE = re.compile(r'(?:\s+|--[^\n]*)*')
+
+# One statement up to and including its terminating ';'. Comments, $$ bodies
+# and quoted strings ('' escapes are two adjacent literals) are consumed
+# whole, so a ';' inside them does not end the statement. Possessive
+# quantifiers (Python 3.11+) rule out backtracking on an unterminated tail.
+_STATEMENT_RE = re.compile(
+    r"(?:[^;'$-]++|--[^\n]*+|\$\$.*?\$\$|'[^']*+'|[$-])*+;",
+    re.DOTALL
+)
+
+
 def split_sql_statements(sql_content):
     """
     Split SQL content into individual statements.
-    Handles $$ blocks (for functions/procedures) and regular ; delimited statements.
+    Handles $$ blocks (for functions/procedures), quoted strings, -- comments
+    and regular ; delimited statements.
+    
+    Each statement is matched by one compiled regex, so the scan over its
+    text runs inside the regex engine rather than a Python loop.
     """
     statements = []
-    current_statement = []
-    in_dollar_quote = False
+    match_statement = _STATEMENT_RE.match
+    skip_noise = _LEADING_NOISE.match
     
-    lines = sql_content.split('\n')
-    
-    for line in lines:
-        # Skip comments
-        if line.strip().startswith('--'):
-            continue
-        
-        # Check for $$ blocks (functions, procedures)
-        if '$$' in line:
-            in_dollar_quote = not in_dollar_quote
-        
-        current_statement.append(line)
-        
-        # If we hit a semicolon and not in a $$ block, end the statement
-        if ';' in line and not in_dollar_quote:
-            stmt = '\n'.join(current_statement).strip()
-            if stmt:
-                statements.append(stmt)
-            current_statement = []
-    
-    # Add any remaining statement
-    if current_statement:
-        stmt = '\n'.join(current_statement).strip()
+    pos = skip_noise(sql_content).end()
+    while True:
+        match = match_statement(sql_content, pos)
+        if match is None:
+            break
+        stmt = match.group().strip()
         if stmt:
             statements.append(stmt)
+        pos = skip_noise(sql_content, match.end()).end()
+    
+    # Add any remaining statement
+    stmt = sql_content[pos:].strip()
+    if stmt:
+        statements.append(stmt)
     
     return statements
 
 
-async def run_migration():
-    """Execute migration SQL."""
+def load_statements(path):
+    """
+    Read a migration file and split it into a tuple of statements.
+    Splitting is cheap next to executing the SQL, so it is redone on every
+    run rather than cached (a cache would go stale when the splitter changes).
+    """
+    # One read() and one bulk decode (no text-mode newline translation)
+    return tuple(split_sql_statements(Path(path).read_bytes().decode('utf-8')))
+
+
+# SQLSTATEs (set on asyncpg errors) for objects/rows that already exist:
+# duplicate_table, duplicate_object, duplicate_column, duplicate_schema,
+# duplicate_function, unique_violation (re-run seed INSERTs)
+_ALREADY_EXISTS_SQLSTATES = frozenset({'42P07', '42710', '42701', '42P06', '42723', '23505'})
+
+
+def group_statements(statements):
+    """
+    Group statements into batches that can be sent in one round-trip.
+    Consecutive plain statements share a batch; $$ bodies and CONCURRENTLY
+    index builds (which cannot run inside the implicit transaction of a
+    multi-statement query) are kept on their own.
+    Returns a tuple of statement tuples (fixed once built, no overallocation).
+    """
+    batches = []
+    run = []
+    for stmt in statements:
+        if '$$' in stmt or 'CONCURRENTLY' in stmt.upper():
+            if run:
+                batches.append(tuple(run))
+                run = []
+            batches.append((stmt,))
+        else:
+            run.append(stmt)
+    if run:
+        batches.append(tuple(run))
+    return tuple(batches)
+
+
+def _preview(stmt):
+    """First 80 chars of a statement on one line."""
+    preview = stmt[:80].replace('\n', ' ').strip()
+    if len(stmt) > 80:
+        preview += "..."
+    return preview
+
+
+async def execute_batch(driver_conn, batch):
+    """
+    Execute a batch of statements as one simple-protocol query.
+    A multi-statement query runs as one implicit transaction, so a failure
+    rolls the whole batch back; the batch is then halved and retried until
+    the failing statement is isolated and reported on its own.
+    """
+    try:
+        await driver_conn.execute('\n'.join(
+            stmt if stmt.endswith(';') else stmt + ';' for stmt in batch
+        ))
+    except Exception as e:
+        if len(batch) > 1:
+            mid = len(batch) // 2
+            await execute_batch(driver_conn, batch[:mid])
+            await execute_batch(driver_conn, batch[mid:])
+            return
+        
+        # Some statements might fail if they already exist
+        if getattr(e, 'sqlstate', None) in _ALREADY_EXISTS_SQLSTATES:
+            print(f"      [WARN] Already exists, skipping: {_preview(batch[0])}")
+        else:
+            print(f"      [ERROR] {str(e)[:100]}")
+            # Continue with other statements
+
+
+_VERIFY_QUERY = text("""
+    SELECT
+        (SELECT COUNT(*) FROM regions) AS regions,
+        (SELECT COUNT(*) FROM communities) AS communities,
+        (
+            SELECT COUNT(*)
+            FROM information_schema.columns
+            WHERE table_name = 'devices'
+            AND column_name IN ('community_id', 'device_type', 'physical_category', 'analytics_template', 'thingspeak_write_key')
+        ) AS devices_columns,
+        (
+            SELECT COUNT(*)
+            FROM information_schema.columns
+            WHERE table_name = 'users'
+            AND column_name = 'community_id'
+        ) AS users_columns
+""")
+
+
+async def run_migration(path: str = MIGRATION_FILE, verbose: bool = True):
+    """
+    Execute migration SQL.
+    With verbose off (--quiet), per-batch statement previews are not built or printed.
+    The regions/communities verification only runs for migration 005.
+    """
     print("=" * 80)
-    print("RUNNING MIGRATION: 005_regions_communities.sql")
+    print(f"RUNNING MIGRATION: {os.path.basename(path)}")
     print("=" * 80)
     
     try:
-        # Read migration file
-        with open('migrations/005_regions_communities.sql', 'r', encoding='utf-8') as f:
-            migration_sql = f.read()
-        
-        print(f"[INFO] Migration file loaded ({len(migration_sql)} characters)")
-        
-        # Split SQL into individual statements
-        statements = split_sql_statements(migration_sql)
-        print(f"[INFO] Parsed {len(statements)} SQL statements")
-        print(f"[INFO] Executing migration...\n")
+        # Read and split migration file in a worker thread, overlapping the
+        # file I/O with the connection handshake below
+        load_task = asyncio.create_task(asyncio.to_thread(load_statements, path))
         
         # Get connection with AUTOCOMMIT to allow multiple statements
         async with engine.connect() as conn:
+            statements = await load_task
+            print(f"[INFO] Loaded {len(statements)} SQL statements from migration file")
+            print(f"[INFO] Executing migration...\n")
+            
             # Enable autocommit
             await conn.execution_options(isolation_level="AUTOCOMMIT")
             
-            for i, stmt in enumerate(statements, 1):
-                if not stmt.strip():
-                    continue
-                
-                # Show what we're executing (first 80 chars)
-                preview = stmt[:80].replace('\n', ' ').strip()
-                if len(stmt) > 80:
-                    preview += "..."
-                print(f"  [{i}/{len(statements)}] {preview}")
+            # asyncpg's own execute() uses the simple query protocol, which
+            # accepts several statements per call (SQLAlchemy's prepares them)
+            raw_conn = await conn.get_raw_connection()
+            driver_conn = raw_conn.driver_connection
+            
+            batches = group_statements(statements)
+            total = len(batches)
+            for i, batch in enumerate(batches, 1):
+                if verbose:
+                    # Show what we're executing (first 80 chars of the first statement)
+                    more = f" (+{len(batch) - 1} more)" if len(batch) > 1 else ""
+                    print(f"  [{i}/{total}] {_preview(batch[0])}{more}")
                 
-                try:
-                    await conn.execute(text(stmt))
-                except Exception as e:
-                    # Some statements might fail if they already exist
-                    error_str = str(e)
-                    if "already exists" in error_str or "duplicate" in error_str.lower():
-                        print(f"      [WARN] Already exists, skipping")
-                    else:
-                        print(f"      [ERROR] {error_str[:100]}")
-                        # Continue with other statements
+                # Statements arrive stripped and non-empty from split_sql_statements
+                await execute_batch(driver_conn, batch)
         
         print("\n[SUCCESS] Migration statements executed")
         
+        if os.path.basename(path) != os.path.basename(MIGRATION_FILE):
+            print("=" * 80)
+            return
+        
         # Verify migration
         print("\n[INFO] Verifying migration...")
         async with engine.connect() as conn:
-            # Check regions
-            result = await conn.execute(text("SELECT COUNT(*) FROM regions"))
-            regions_count = result.scalar()
-            print(f"  [OK] regions table: {regions_count} rows")
-            
-            # Check communities
-            result = await conn.execute(text("SELECT COUNT(*) FROM communities"))
-            communities_count = result.scalar()
-            print(f"  [OK] communities table: {communities_count} rows")
-            
-            # Check devices columns
-            result = await conn.execute(text("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'devices' 
-                AND column_name IN ('community_id', 'device_type', 'physical_category', 'analytics_template', 'thingspeak_write_key')
-            """))
-            devices_columns = result.fetchall()
-            print(f"  [OK] devices table: {len(devices_columns)} new columns added")
-            
-            # Check users columns
-            result = await conn.execute(text("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'users' 
-                AND column_name = 'community_id'
-            """))
-            users_columns = result.fetchall()
-            if users_columns:
+            # All checks in one round-trip (one row of scalar subqueries)
+            result = await conn.execute(_VERIFY_QUERY)
+            checks = result.one()
+            print(f"  [OK] regions table: {checks.regions} rows")
+            print(f"  [OK] communities table: {checks.communities} rows")
+            print(f"  [OK] devices table: {checks.devices_columns} new columns added")
+            if checks.users_columns:
                 print(f"  [OK] users.community_id column added")
         
         print("\n[SUCCESS] Migration completed successfully! Database is ready.")
@@ -136,4 +220,5 @@ async def run_migration():
 
 
 if __name__ == "__main__":
-    asyncio.run(run_migration())
+    args = [arg for arg in sys.argv[1:] if arg != "--quiet"]
+    asyncio.run(run_migration(args[0] if args else MIGRATION_FILE, verbose="--quiet" not in sys.argv))
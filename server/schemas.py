@@ -2,7 +2,7 @@
 Pydantic schemas for request/response validation.
 Clean and simple data models.
 """
-from pydantic import BaseModel, EmailStr, field_validator
+from pydantic import AliasChoices, BaseModel, ConfigDict, EmailStr, Field, TypeAdapter, field_validator
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from uuid import UUID
@@ -20,8 +20,8 @@ class UserResponse(BaseModel):
     role: str
     created_at: datetime
     
-    class Config:
-        from_attributes = True  # Pydantic v2 (was orm_mode in v1)
+    # Response models are never mutated after construction: frozen skips setattr validation
+    model_config = ConfigDict(from_attributes=True, frozen=True)  # from_attributes was orm_mode in v1
 
 
 # ============================================================================
@@ -43,8 +43,7 @@ class RegionResponse(BaseModel):
             return str(v)
         return v
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class CommunityCreate(BaseModel):
@@ -74,8 +73,7 @@ class CommunityResponse(BaseModel):
             return str(v)
         return v
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class CustomerCreate(BaseModel):
@@ -106,10 +104,9 @@ class DeviceCreate(BaseModel):
     specifications: Optional[str] = None  # Technical specs
     status: Optional[str] = "active"  # Status of device
     is_active: Optional[str] = "true"  # String "true"/"false"
-    latitude: Optional[float] = None  # Primary geo field
-    longitude: Optional[float] = None  # Primary geo field
-    lat: Optional[float] = None  # Legacy compatibility
-    lng: Optional[float] = None  # Legacy compatibility
+    # Primary geo fields; legacy clients may send lat/lng instead
+    latitude: Optional[float] = Field(default=None, validation_alias=AliasChoices("latitude", "lat"))
+    longitude: Optional[float] = Field(default=None, validation_alias=AliasChoices("longitude", "lng"))
     location_name: Optional[str] = None
     community_id: Optional[str] = None  # References Community.id
     thingspeak_channel_id: Optional[str] = None
@@ -132,10 +129,8 @@ class DeviceUpdate(BaseModel):
     specifications: Optional[str] = None
     status: Optional[str] = None
     is_active: Optional[str] = None
-    latitude: Optional[float] = None
-    longitude: Optional[float] = None
-    lat: Optional[float] = None
-    lng: Optional[float] = None
+    latitude: Optional[float] = Field(default=None, validation_alias=AliasChoices("latitude", "lat"))
+    longitude: Optional[float] = Field(default=None, validation_alias=AliasChoices("longitude", "lng"))
     location_name: Optional[str] = None
     community_id: Optional[str] = None
     thingspeak_channel_id: Optional[str] = None
@@ -173,8 +168,7 @@ class DeviceResponse(BaseModel):
     updated_at: datetime
     last_seen: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class DeviceMapResponse(BaseModel):
@@ -189,8 +183,11 @@ class DeviceMapResponse(BaseModel):
     specifications: Optional[str] = None
     status: str
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+# Whole-list validation/serialization in one pydantic-core call (map endpoints)
+DeviceMapListAdapter = TypeAdapter(List[DeviceMapResponse])
 
 
 # ============================================================================
@@ -203,6 +200,20 @@ class TelemetryResponse(BaseModel):
     data: Dict[str, Any]
 
 
+MAX_TELEMETRY_BATCH = 100  # Device ids per batch request (each may cost a ThingSpeak call)
+
+
+class TelemetryBatchRequest(BaseModel):
+    """Request latest telemetry for several devices in one call."""
+    device_ids: List[str] = Field(..., min_length=1, max_length=MAX_TELEMETRY_BATCH)
+    
+    @field_validator('device_ids')
+    @classmethod
+    def dedupe_device_ids(cls, v):
+        """Drop repeated ids, keeping first-seen order."""
+        return list(dict.fromkeys(v))
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
     status: str
@@ -233,8 +244,7 @@ class AuditLogResponse(BaseModel):
     details: Optional[Dict[str, Any]] = None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 # ============================================================================
@@ -259,8 +269,7 @@ class FrontendErrorResponse(BaseModel):
     user_id: Optional[str] = None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 # ============================================================================
@@ -316,8 +325,7 @@ class PipelineResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class PipelineMapResponse(BaseModel):
@@ -327,6 +335,5 @@ class PipelineMapResponse(BaseModel):
     positions: List[List[float]]  # [[lat, lng], [lat, lng], ...] for React-Leaflet
     color: str
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
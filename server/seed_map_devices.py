@@ -5,7 +5,8 @@ Populates the devices table with water management infrastructure data.
 import asyncio
 import sys
 from sqlalchemy import text
-from database import SessionLocal
+from database import engine
+from models import uuid7
 
 # Device data extracted from map.html
 MAP_DEVICES = [
@@ -69,105 +70,100 @@ MAP_DEVICES = [
 ]
 
 
+# Categorical values repeat across rows; intern them so every row shares one
+# str object per distinct value (cheaper to hold, hash and compare)
+for _device in MAP_DEVICES:
+    for _key in ("asset_type", "asset_category", "capacity", "specifications", "status"):
+        _device[_key] = sys.intern(_device[_key])
+
+# Same data as parallel per-column lists (struct of arrays), transposed once:
+# each column binds as a single array parameter to unnest()
+MAP_DEVICE_COLUMNS = {key: [d[key] for d in MAP_DEVICES] for key in MAP_DEVICES[0]}
+
+
+# SQL statements, built once at import
+# One INSERT ... SELECT FROM unnest(...) ON CONFLICT (node_key) DO UPDATE:
+# a single statement and a single set of parameters for every device, no
+# existence check. xmax is 0 only on freshly inserted row versions, so
+# RETURNING tells inserts from updates.
+UPSERT_SQL = text("""
+    INSERT INTO devices (
+        id, node_key, label, name, asset_type, asset_category,
+        latitude, longitude, capacity, specifications,
+        status, is_active, user_id, category, created_at, updated_at
+    )
+    SELECT
+        u.id, u.node_key, u.label, u.name, u.asset_type, u.asset_category,
+        u.latitude, u.longitude, u.capacity, u.specifications,
+        u.status, 'true', CAST(:user_id AS text), u.asset_type, NOW(), NOW()
+    FROM unnest(
+        CAST(:id AS uuid[]),
+        CAST(:node_key AS text[]),
+        CAST(:label AS text[]),
+        CAST(:name AS text[]),
+        CAST(:asset_type AS text[]),
+        CAST(:asset_category AS text[]),
+        CAST(:latitude AS float8[]),
+        CAST(:longitude AS float8[]),
+        CAST(:capacity AS text[]),
+        CAST(:specifications AS text[]),
+        CAST(:status AS text[])
+    ) AS u(id, node_key, label, name, asset_type, asset_category, latitude, longitude, capacity, specifications, status)
+    ON CONFLICT (node_key) DO UPDATE SET
+        name = EXCLUDED.name,
+        asset_type = EXCLUDED.asset_type,
+        asset_category = EXCLUDED.asset_category,
+        latitude = EXCLUDED.latitude,
+        longitude = EXCLUDED.longitude,
+        capacity = EXCLUDED.capacity,
+        specifications = EXCLUDED.specifications,
+        status = EXCLUDED.status,
+        is_active = 'true',
+        updated_at = NOW()
+    RETURNING name, (xmax = 0) AS inserted
+""")
+
+# Use dev-bypass admin user
+ADMIN_USER_ID = "dev-bypass-id-admin@evara.com"
+
+# UPSERT_SQL's complete parameter set, built once at import: a run binds it
+# as-is. Time-ordered ids keep new rows at the right edge of the primary key
+# index (only used for rows that end up inserted); category mirrors
+# asset_type for compatibility (set in UPSERT_SQL).
+UPSERT_PARAMS = {
+    **MAP_DEVICE_COLUMNS,
+    "id": [uuid7() for _ in MAP_DEVICES],
+    "user_id": ADMIN_USER_ID
+}
+
+
 async def seed_devices():
     """Seed devices table with map data."""
-    async with SessionLocal() as db:
-        try:
-            # Use dev-bypass admin user
-            admin_user_id = "dev-bypass-id-admin@evara.com"
-            
-            print(f"[SEED] Starting device seed for user: {admin_user_id}")
-            print(f"[SEED] Total devices to insert: {len(MAP_DEVICES)}")
-            
-            inserted = 0
-            updated = 0
-            
-            for device_data in MAP_DEVICES:
-                # Check if device already exists
-                check_query = text("""
-                    SELECT id FROM devices WHERE node_key = :node_key
-                """)
-                result = await db.execute(check_query, {"node_key": device_data["node_key"]})
-                existing = result.fetchone()
-                
-                if existing:
-                    # Update existing device
-                    update_query = text("""
-                        UPDATE devices SET
-                            name = :name,
-                            asset_type = :asset_type,
-                            asset_category = :asset_category,
-                            latitude = :latitude,
-                            longitude = :longitude,
-                            capacity = :capacity,
-                            specifications = :specifications,
-                            status = :status,
-                            is_active = 'true',
-                            updated_at = NOW()
-                        WHERE node_key = :node_key
-                    """)
-                    await db.execute(update_query, {
-                        "node_key": device_data["node_key"],
-                        "name": device_data["name"],
-                        "asset_type": device_data["asset_type"],
-                        "asset_category": device_data["asset_category"],
-                        "latitude": device_data["latitude"],
-                        "longitude": device_data["longitude"],
-                        "capacity": device_data["capacity"],
-                        "specifications": device_data["specifications"],
-                        "status": device_data["status"]
-                    })
-                    updated += 1
-                    print(f"  ✓ Updated: {device_data['name']}")
-                else:
-                    # Insert new device
-                    insert_query = text("""
-                        INSERT INTO devices (
-                            id, node_key, label, name, asset_type, asset_category,
-                            latitude, longitude, capacity, specifications,
-                            status, is_active, user_id, category, created_at, updated_at
-                        ) VALUES (
-                            gen_random_uuid(), :node_key, :label, :name, :asset_type, :asset_category,
-                            :latitude, :longitude, :capacity, :specifications,
-                            :status, 'true', :user_id, :category, NOW(), NOW()
-                        )
-                    """)
-                    await db.execute(insert_query, {
-                        "node_key": device_data["node_key"],
-                        "label": device_data["label"],
-                        "name": device_data["name"],
-                        "asset_type": device_data["asset_type"],
-                        "asset_category": device_data["asset_category"],
-                        "latitude": device_data["latitude"],
-                        "longitude": device_data["longitude"],
-                        "capacity": device_data["capacity"],
-                        "specifications": device_data["specifications"],
-                        "status": device_data["status"],
-                        "user_id": admin_user_id,
-                        "category": device_data["asset_type"]  # Set category same as asset_type for compatibility
-                    })
-                    inserted += 1
-                    print(f"  ✓ Inserted: {device_data['name']}")
-            
-            await db.commit()
-            
-            print(f"\n[SEED] Complete!")
-            print(f"  - Inserted: {inserted} devices")
-            print(f"  - Updated: {updated} devices")
-            print(f"  - Total: {inserted + updated} devices")
-            
-            # Verify count
-            count_query = text("SELECT COUNT(*) FROM devices WHERE is_active = 'true'")
-            result = await db.execute(count_query)
-            total = result.scalar()
-            print(f"  - Active devices in database: {total}")
-            
-        except Exception as e:
-            print(f"[ERROR] Seed failed: {e}")
-            import traceback
-            traceback.print_exc()
-            await db.rollback()
-            raise
+    print(f"[SEED] Starting device seed for user: {ADMIN_USER_ID}")
+    print(f"[SEED] Total devices to insert: {len(MAP_DEVICES)}")
+    
+    try:
+        # Bare connection, no ORM session: these are plain text() statements.
+        # engine.begin() commits on exit and rolls back if anything raises.
+        async with engine.begin() as conn:
+            result = await conn.execute(UPSERT_SQL, UPSERT_PARAMS)
+            rows = result.all()
+            # One write for the whole list instead of a print (and flush) per row
+            sys.stdout.write("".join(
+                f"  ✓ {'Inserted' if inserted else 'Updated'}: {name}\n" for name, inserted in rows
+            ))
+            inserted = sum(1 for _, was_inserted in rows if was_inserted)
+            updated = len(rows) - inserted
+    except Exception as e:
+        print(f"[ERROR] Seed failed: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+    
+    print(f"\n[SEED] Complete!")
+    print(f"  - Inserted: {inserted} devices")
+    print(f"  - Updated: {updated} devices")
+    print(f"  - Total: {inserted + updated} devices")
 
 
 if __name__ == "__main__":
@@ -4,12 +4,17 @@ Inserts water supply and borewell pipeline data from reference files.
 """
 import asyncio
 import sys
-import json
-from sqlalchemy import select, text
-from sqlalchemy.ext.asyncio import AsyncSession
+import numpy as np
+import orjson
+from sqlalchemy import text
 from database import engine
-from models import Pipeline
-import uuid
+from models import encode_coordinates, uuid7
+
+# Column order of the seed rows, shared by the COPY insert and the unnest() update
+SEED_COLUMNS = (
+    'name', 'pipeline_type', 'coordinates', 'coordinates_bin', 'color',
+    'diameter', 'material', 'installation_type', 'status'
+)
 
 # Pipeline data extracted from pipelines.html
 PIPELINES_DATA = [
@@ -219,82 +224,121 @@ PIPELINES_DATA = [
 ]
 
 
+# Categorical values repeat across rows; intern them so every row shares one
+# str object per distinct value (cheaper to hold, hash and compare)
+for _pipeline in PIPELINES_DATA:
+    for _key in ("pipeline_type", "color", "diameter", "material", "installation_type", "status"):
+        if isinstance(_pipeline.get(_key), str):
+            _pipeline[_key] = sys.intern(_pipeline[_key])
+
+# Hold each polyline as one contiguous (N, 2) float64 array instead of nested
+# lists of boxed floats, rejecting malformed data at import rather than mid-seed
+for _pipeline in PIPELINES_DATA:
+    _coords = np.asarray(_pipeline['coordinates'], dtype=np.float64)
+    if _coords.ndim != 2 or _coords.shape[1] != 2 or len(_coords) < 2:
+        raise ValueError(f"Pipeline {_pipeline['name']!r}: coordinates must be at least two [lng, lat] pairs")
+    if not np.isfinite(_coords).all():
+        raise ValueError(f"Pipeline {_pipeline['name']!r}: coordinates must be finite numbers")
+    _pipeline['coordinates'] = _coords
+
+# Serialize each polyline once at import (JSON text for the JSONB column,
+# packed float32 pairs for coordinates_bin), not per seeded row
+for _pipeline in PIPELINES_DATA:
+    _pipeline['coordinates_json'] = orjson.dumps(_pipeline['coordinates'], option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    _pipeline['coordinates_bin'] = encode_coordinates(_pipeline['coordinates'])
+
+
+# SQL statements, built once at import
+EXISTING_NAMES_SQL = text("SELECT name FROM pipelines WHERE name = ANY(:names)")
+
+# Refresh existing pipelines from parallel column arrays (SEED_COLUMNS order)
+UPDATE_SQL = text("""
+    UPDATE pipelines p
+    SET pipeline_type = u.pipeline_type,
+        coordinates = u.coordinates::jsonb,
+        coordinates_bin = u.coordinates_bin,
+        color = u.color,
+        diameter = u.diameter,
+        material = u.material,
+        installation_type = u.installation_type,
+        status = u.status,
+        is_active = TRUE,
+        updated_at = NOW()
+    FROM unnest(
+        CAST(:name AS text[]),
+        CAST(:pipeline_type AS text[]),
+        CAST(:coordinates AS text[]),
+        CAST(:coordinates_bin AS bytea[]),
+        CAST(:color AS text[]),
+        CAST(:diameter AS text[]),
+        CAST(:material AS text[]),
+        CAST(:installation_type AS text[]),
+        CAST(:status AS text[])
+    ) AS u(name, pipeline_type, coordinates, coordinates_bin, color, diameter, material, installation_type, status)
+    WHERE p.name = u.name
+""")
+
+
 async def seed_pipelines():
     """Seed pipelines into database."""
     print("[SEED] Starting pipeline seed...")
     print(f"[SEED] Total pipelines to insert: {len(PIPELINES_DATA)}")
     
+    # One transaction: the existence check, COPY and UPDATE commit together
     async with engine.begin() as conn:
-        # Get existing pipeline names
-        result = await conn.execute(text("SELECT name FROM pipelines"))
+        # Get which of the seeded names already exist (one round trip, only our rows)
+        result = await conn.execute(
+            EXISTING_NAMES_SQL,
+            {"names": [p['name'] for p in PIPELINES_DATA]}
+        )
         existing_names = {row[0] for row in result}
         
-        inserted_count = 0
-        updated_count = 0
-        
+        # Partition into updates and inserts as tuples in SEED_COLUMNS order
+        updates = []
+        inserts = []
         for pipeline_data in PIPELINES_DATA:
-            name = pipeline_data['name']
-            
-            if name in existing_names:
-                # Update existing
-                await conn.execute(
-                    text("""
-                        UPDATE pipelines
-                        SET pipeline_type = :pipeline_type,
-                            coordinates = :coordinates,
-                            color = :color,
-                            diameter = :diameter,
-                            material = :material,
-                            installation_type = :installation_type,
-                            status = :status,
-                            is_active = TRUE,
-                            updated_at = NOW()
-                        WHERE name = :name
-                    """),
-                    {
-                        "name": name,
-                        "pipeline_type": pipeline_data['pipeline_type'],
-                        "coordinates": json.dumps(pipeline_data['coordinates']),
-                        "color": pipeline_data['color'],
-                        "diameter": pipeline_data.get('diameter'),
-                        "material": pipeline_data.get('material'),
-                        "installation_type": pipeline_data.get('installation_type'),
-                        "status": pipeline_data['status']
-                    }
-                )
-                updated_count += 1
-                print(f"✓ Updated: {name}")
+            row = (
+                pipeline_data['name'],
+                pipeline_data['pipeline_type'],
+                pipeline_data['coordinates_json'],
+                pipeline_data['coordinates_bin'],
+                pipeline_data['color'],
+                pipeline_data.get('diameter'),
+                pipeline_data.get('material'),
+                pipeline_data.get('installation_type'),
+                pipeline_data['status']
+            )
+            if pipeline_data['name'] in existing_names:
+                updates.append(row)
             else:
-                # Insert new
-                await conn.execute(
-                    text("""
-                        INSERT INTO pipelines (id, name, pipeline_type, coordinates, color, diameter, material, installation_type, status, is_active, created_by)
-                        VALUES (:id, :name, :pipeline_type, :coordinates, :color, :diameter, :material, :installation_type, :status, TRUE, 'dev-bypass-id-admin@evara.com')
-                    """),
-                    {
-                        "id": str(uuid.uuid4()),
-                        "name": name,
-                        "pipeline_type": pipeline_data['pipeline_type'],
-                        "coordinates": json.dumps(pipeline_data['coordinates']),
-                        "color": pipeline_data['color'],
-                        "diameter": pipeline_data.get('diameter'),
-                        "material": pipeline_data.get('material'),
-                        "installation_type": pipeline_data.get('installation_type'),
-                        "status": pipeline_data['status']
-                    }
-                )
-                inserted_count += 1
-                print(f"✓ Inserted: {name}")
+                inserts.append((uuid7(), *row, True, 'dev-bypass-id-admin@evara.com'))
+        
+        if updates:
+            # Update existing: one statement, one array parameter per column
+            await conn.execute(
+                UPDATE_SQL,
+                dict(zip(SEED_COLUMNS, map(list, zip(*updates))))
+            )
+            sys.stdout.write("".join(f"✓ Updated: {row[0]}\n" for row in updates))
+        
+        if inserts:
+            # Insert new: binary COPY on this transaction's asyncpg connection
+            # (no SQL parse per row; created_at/updated_at take column defaults)
+            raw_conn = await conn.get_raw_connection()
+            await raw_conn.driver_connection.copy_records_to_table(
+                'pipelines',
+                records=inserts,
+                columns=('id', *SEED_COLUMNS, 'is_active', 'created_by')
+            )
+            sys.stdout.write("".join(f"✓ Inserted: {row[1]}\n" for row in inserts))
         
-        # Verify final count
-        result = await conn.execute(text("SELECT COUNT(*) FROM pipelines WHERE is_active = TRUE"))
-        total_count = result.scalar()
+        inserted_count = len(inserts)
+        updated_count = len(updates)
         
         print(f"\n[SEED] Complete!")
         print(f"  - Inserted: {inserted_count} pipelines")
         print(f"  - Updated: {updated_count} pipelines")
         print(f"  - Total: {inserted_count + updated_count} pipelines")
-        print(f"  - Active pipelines in database: {total_count}")
 
 
 if __name__ == "__main__":
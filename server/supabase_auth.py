@@ -9,12 +9,54 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from config import get_settings
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+import hashlib
 import time
 
 settings = get_settings()
 security = HTTPBearer()
 
+# Verified token cache: {blake2b(token): (expires_at, payload)}
+# Skips HMAC verification for tokens already seen within their validity window.
+TOKEN_CACHE_TTL = 300  # Never trust a cached payload longer than 5 minutes
+TOKEN_CACHE_MAX_SIZE = 10000
+_token_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+def _token_cache_key(token: str) -> str:
+    """Hash the token so raw credentials are never kept in memory as keys."""
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+
+def _get_cached_payload(key: str) -> Optional[Dict[str, Any]]:
+    """Return cached payload if present and not expired."""
+    entry = _token_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, payload = entry
+    if time.time() >= expires_at:
+        _token_cache.pop(key, None)
+        return None
+    return payload
+
+
+def _cache_payload(key: str, payload: Dict[str, Any]) -> None:
+    """Cache a verified payload until min(token exp, TOKEN_CACHE_TTL)."""
+    now = time.time()
+    expires_at = now + TOKEN_CACHE_TTL
+    exp = payload.get("exp")
+    if exp:
+        expires_at = min(expires_at, exp)
+    if expires_at <= now:
+        return
+    if len(_token_cache) >= TOKEN_CACHE_MAX_SIZE:
+        # Drop expired entries first, then fall back to clearing everything
+        for stale_key in [k for k, (t, _) in _token_cache.items() if t <= now]:
+            del _token_cache[stale_key]
+        if len(_token_cache) >= TOKEN_CACHE_MAX_SIZE:
+            _token_cache.clear()
+    _token_cache[key] = (expires_at, payload)
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -78,6 +120,12 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Fast path: token already verified and still within its validity window
+    cache_key = _token_cache_key(token)
+    cached_payload = _get_cached_payload(cache_key)
+    if cached_payload is not None:
+        return cached_payload
+    
     try:
         # Decode and verify JWT
         payload = jwt.decode(
@@ -109,6 +157,7 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
+        _cache_payload(cache_key, payload)
         return payload
         
     except jwt.ExpiredSignatureError:
@@ -138,6 +187,22 @@ async def get_current_user(
         )
 
 
+# Supabase admin client singleton (service-role, used for user management)
+_supabase_admin = None
+
+
+def get_supabase_admin():
+    """
+    Get or create the Supabase admin client singleton.
+    Avoids building a new HTTP client and auth session on every request.
+    """
+    global _supabase_admin
+    if _supabase_admin is None:
+        from supabase import create_client
+        _supabase_admin = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+    return _supabase_admin
+
+
 def get_user_id(user_payload: Dict[str, Any]) -> str:
     """Extract user ID from JWT payload."""
     return user_payload.get("sub")
@@ -0,0 +1,105 @@
+"""
+Unit tests for the buffered audit/frontend-error writer
+The database insert is replaced with an in-memory recorder
+"""
+import asyncio
+
+from audit_buffer import AuditBuffer
+
+
+class FakeModel:
+    __tablename__ = "fake_logs"
+
+
+def make_buffer(fail_times: int = 0, **kwargs):
+    """AuditBuffer whose inserts are recorded (and fail the first fail_times calls)."""
+    buffer = AuditBuffer(retry_delay=0, **kwargs)
+    buffer.written = []
+    buffer.attempts = 0
+    
+    async def fake_insert(batch):
+        buffer.attempts += 1
+        if buffer.attempts <= fail_times:
+            raise RuntimeError("database unavailable")
+        buffer.written.extend(row for _, row in batch)
+    
+    buffer._insert = fake_insert
+    return buffer
+
+
+def test_stop_flushes_batch_held_during_linger():
+    async def run():
+        buffer = make_buffer(max_delay=60)
+        buffer.start()
+        for i in range(3):
+            buffer.put(FakeModel, {"n": i})
+        # Let the writer take the rows off the queue and start lingering
+        await asyncio.sleep(0.01)
+        assert buffer.queue.empty()
+        await buffer.stop()
+        return buffer
+    
+    buffer = asyncio.run(run())
+    assert buffer.written == [{"n": 0}, {"n": 1}, {"n": 2}]
+
+
+def test_stop_flushes_rows_still_queued():
+    async def run():
+        buffer = make_buffer(max_batch=2, max_delay=60)
+        for i in range(5):
+            buffer.put(FakeModel, {"n": i})
+        buffer.start()
+        await buffer.stop()
+        return buffer
+    
+    buffer = asyncio.run(run())
+    assert sorted(row["n"] for row in buffer.written) == [0, 1, 2, 3, 4]
+
+
+def test_stop_without_rows_returns_promptly():
+    async def run():
+        buffer = make_buffer()
+        buffer.start()
+        await asyncio.wait_for(buffer.stop(), timeout=1)
+        return buffer
+    
+    assert asyncio.run(run()).written == []
+
+
+def test_failed_write_is_retried():
+    async def run():
+        buffer = make_buffer(fail_times=2, max_attempts=3)
+        buffer.put(FakeModel, {"n": 1})
+        await buffer.stop()
+        return buffer
+    
+    buffer = asyncio.run(run())
+    assert buffer.attempts == 3
+    assert buffer.written == [{"n": 1}]
+    assert buffer.dropped == 0
+
+
+def test_rows_dropped_after_max_attempts():
+    async def run():
+        buffer = make_buffer(fail_times=10, max_attempts=2)
+        buffer.put(FakeModel, {"n": 1})
+        buffer.put(FakeModel, {"n": 2})
+        await buffer.stop()
+        return buffer
+    
+    buffer = asyncio.run(run())
+    assert buffer.attempts == 2
+    assert buffer.written == []
+    assert buffer.dropped == 2
+
+
+def test_put_drops_when_queue_full():
+    async def run():
+        buffer = make_buffer(max_queue=1)
+        buffer.put(FakeModel, {"n": 1})
+        buffer.put(FakeModel, {"n": 2})
+        return buffer
+    
+    buffer = asyncio.run(run())
+    assert buffer.queue.qsize() == 1
+    assert buffer.dropped == 1
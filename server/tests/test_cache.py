@@ -0,0 +1,35 @@
+"""
+Unit tests for the in-process response caches and their keys
+No database required
+"""
+import cache
+from cache import ResponseCache, device_channel_cache_key
+
+DEVICE_ID = "0190f5c2-7a1b-7c3d-9e4f-a1b2c3d4e5f6"
+
+
+def test_cache_returns_value_until_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    responses = ResponseCache(ttl=30.0)
+    responses.set("k", "v")
+    now[0] += 29.9
+    assert responses.get("k") == "v"
+    now[0] += 0.1
+    assert responses.get("k") is None
+
+
+def test_channel_key_ignores_id_case():
+    assert device_channel_cache_key(DEVICE_ID.upper()) == device_channel_cache_key(DEVICE_ID)
+
+
+def test_invalidate_with_other_id_case_clears_entry():
+    configs = ResponseCache(ttl=30.0)
+    configs.set(device_channel_cache_key(DEVICE_ID), ("owner", "42", "read-key"))
+    configs.invalidate(device_channel_cache_key(DEVICE_ID.upper()))
+    assert configs.get(device_channel_cache_key(DEVICE_ID)) is None
+
+
+def test_channel_config_ttl_is_short():
+    # Invalidation only reaches the worker that handled the write
+    assert cache.channel_config_cache.ttl <= 60.0
@@ -0,0 +1,46 @@
+"""
+Unit tests for classifying IntegrityErrors raised by device creation
+Driver exceptions are minimal fakes; no database required
+"""
+from sqlalchemy.exc import IntegrityError
+
+import main
+
+
+class FakeDriverError(Exception):
+    def __init__(self, message, sqlstate, constraint_name=None):
+        super().__init__(message)
+        self.sqlstate = sqlstate
+        self.constraint_name = constraint_name
+
+
+def wrap(driver_error: Exception) -> IntegrityError:
+    """DBAPI-style wrapper chained to the driver error, as the asyncpg adapter does."""
+    class AdaptedError(Exception):
+        sqlstate = driver_error.sqlstate
+    
+    try:
+        raise AdaptedError(str(driver_error)) from driver_error
+    except AdaptedError as adapted:
+        return IntegrityError("INSERT INTO devices ...", {}, adapted)
+
+
+def test_node_key_unique_violation_is_conflict():
+    for constraint in ("devices_node_key_key", "ix_devices_node_key"):
+        error = wrap(FakeDriverError("duplicate key", "23505", constraint))
+        assert main._is_node_key_conflict(error)
+
+
+def test_other_unique_violation_is_not_conflict():
+    error = wrap(FakeDriverError("duplicate key", "23505", "devices_pkey"))
+    assert not main._is_node_key_conflict(error)
+
+
+def test_non_unique_violation_is_not_conflict():
+    error = wrap(FakeDriverError('null value in column "node_key"', "23502"))
+    assert not main._is_node_key_conflict(error)
+
+
+def test_message_fallback_without_constraint_name():
+    error = wrap(FakeDriverError('duplicate key value violates unique constraint on "node_key"', "23505"))
+    assert main._is_node_key_conflict(error)
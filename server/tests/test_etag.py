@@ -0,0 +1,78 @@
+"""
+Unit tests for ETag generation and conditional GET (304) evaluation
+Requests are minimal fakes carrying only headers; no database required
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+import main
+from cache import etag_matches, make_etag
+
+
+class FakeRequest:
+    def __init__(self, **headers):
+        self.headers = {name.replace("_", "-"): value for name, value in headers.items()}
+
+
+ETAG = make_etag(b'{"devices":[]}')
+LAST_MODIFIED_AT = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+LAST_MODIFIED = LAST_MODIFIED_AT.timestamp()
+
+
+# ============================================================================
+# make_etag / etag_matches
+# ============================================================================
+
+def test_make_etag_is_quoted_and_content_addressed():
+    assert ETAG.startswith('"') and ETAG.endswith('"')
+    assert make_etag(b'{"devices":[]}') == ETAG
+    assert make_etag(b'{"devices":[1]}') != ETAG
+
+
+def test_etag_matches_exact_tag():
+    assert etag_matches(ETAG, ETAG)
+    assert not etag_matches('"other"', ETAG)
+
+
+def test_etag_matches_any_tag_in_list():
+    assert etag_matches(f'"stale", {ETAG} ,"older"', ETAG)
+    assert not etag_matches('"stale", "older"', ETAG)
+
+
+def test_etag_matches_weakly():
+    assert etag_matches(f"W/{ETAG}", ETAG)
+    assert etag_matches(ETAG, f"W/{ETAG}")
+    assert etag_matches(f'"stale", W/{ETAG}', ETAG)
+
+
+def test_etag_matches_wildcard():
+    assert etag_matches("*", ETAG)
+    assert etag_matches(" * ", ETAG)
+
+
+# ============================================================================
+# _not_modified
+# ============================================================================
+
+def test_not_modified_without_validators():
+    assert not main._not_modified(FakeRequest(), ETAG, LAST_MODIFIED)
+
+
+def test_not_modified_uses_if_none_match_list():
+    request = FakeRequest(if_none_match=f'"stale", W/{ETAG}')
+    assert main._not_modified(request, ETAG, LAST_MODIFIED)
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    request = FakeRequest(
+        if_none_match='"stale"',
+        if_modified_since=format_datetime(LAST_MODIFIED_AT, usegmt=True)
+    )
+    assert not main._not_modified(request, ETAG, LAST_MODIFIED)
+
+
+def test_if_modified_since_without_etag():
+    current = FakeRequest(if_modified_since=format_datetime(LAST_MODIFIED_AT, usegmt=True))
+    older = FakeRequest(if_modified_since="Wed, 01 Jan 2025 00:00:00 GMT")
+    assert main._not_modified(current, ETAG, LAST_MODIFIED)
+    assert not main._not_modified(older, ETAG, LAST_MODIFIED)
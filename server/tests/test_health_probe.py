@@ -0,0 +1,98 @@
+"""
+Unit tests for the /health probe cache (stale-while-revalidate with a grace window)
+Probes are fakes; no database required
+"""
+import asyncio
+import itertools
+
+import main
+
+_names = itertools.count()
+
+UNAVAILABLE = ("error: unavailable", "degraded")
+
+
+def probe_name() -> str:
+    """Fresh cache slot per test."""
+    return f"test-probe-{next(_names)}"
+
+
+def test_fresh_result_is_reused():
+    calls = []
+    
+    async def probe():
+        calls.append(1)
+        return ("ok", "ok")
+    
+    async def run():
+        name = probe_name()
+        first = await main._cached_probe(name, 60, probe, UNAVAILABLE)
+        second = await main._cached_probe(name, 60, probe, UNAVAILABLE)
+        return first, second
+    
+    assert asyncio.run(run()) == (("ok", "ok"), ("ok", "ok"))
+    assert len(calls) == 1
+
+
+def test_stale_result_served_within_grace(monkeypatch):
+    monkeypatch.setattr(main, "HEALTH_STALE_GRACE", 60)
+    results = iter([("ok", "ok"), ("error: down", "critical")])
+    
+    async def probe():
+        return next(results)
+    
+    async def run():
+        name = probe_name()
+        await main._cached_probe(name, 0.01, probe, UNAVAILABLE)
+        await asyncio.sleep(0.02)
+        # Expired but within grace: old value now, refresh in the background
+        stale = await main._cached_probe(name, 0.01, probe, UNAVAILABLE)
+        await asyncio.sleep(0)
+        return stale, main._health_cache[name][1]
+    
+    stale, refreshed = asyncio.run(run())
+    assert stale == ("ok", "ok")
+    assert refreshed == ("error: down", "critical")
+
+
+def test_overdue_refresh_reports_unavailable(monkeypatch):
+    monkeypatch.setattr(main, "HEALTH_STALE_GRACE", 0.01)
+    hang = asyncio.Event()
+    first = [True]
+    
+    async def probe():
+        if first[0]:
+            first[0] = False
+            return ("ok", "ok")
+        await hang.wait()  # Database hangs on every later probe
+        return ("ok", "ok")
+    
+    async def run():
+        name = probe_name()
+        await main._cached_probe(name, 0.01, probe, UNAVAILABLE)
+        await asyncio.sleep(0.05)  # Past TTL + grace
+        result = await main._cached_probe(name, 0.01, probe, UNAVAILABLE)
+        hang.set()
+        await asyncio.sleep(0)
+        return result
+    
+    assert asyncio.run(run()) == UNAVAILABLE
+
+
+def test_failed_refresh_replaces_stale_value(monkeypatch):
+    monkeypatch.setattr(main, "HEALTH_STALE_GRACE", 0.01)
+    first = [True]
+    
+    async def probe():
+        if first[0]:
+            first[0] = False
+            return ("ok", "ok")
+        raise RuntimeError("probe crashed")
+    
+    async def run():
+        name = probe_name()
+        await main._cached_probe(name, 0.01, probe, UNAVAILABLE)
+        await asyncio.sleep(0.05)
+        return await main._cached_probe(name, 0.01, probe, UNAVAILABLE)
+    
+    assert asyncio.run(run()) == UNAVAILABLE
@@ -0,0 +1,113 @@
+"""
+Unit tests for the buffered last_seen flush: its statement and lifecycle
+Statements are compiled for PostgreSQL or sent to a fake session; no database required
+"""
+import asyncio
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
+
+import main
+
+
+def compile_update(pending):
+    return str(main._last_seen_update(pending).compile(dialect=postgresql.dialect()))
+
+
+def test_last_seen_update_does_not_bump_updated_at():
+    sql = compile_update({"a": datetime(2026, 1, 1), "b": datetime(2026, 1, 2)})
+    assert "updated_at=devices.updated_at" in sql
+    assert "now()" not in sql
+
+
+def test_last_seen_update_sets_per_device_timestamps():
+    sql = compile_update({"a": datetime(2026, 1, 1), "b": datetime(2026, 1, 2)})
+    assert "last_seen=CASE devices.id" in sql
+    assert sql.count("WHEN") == 2
+
+
+# ============================================================================
+# Flush lifecycle
+# ============================================================================
+
+class FakeSession:
+    """Async session stand-in whose execute() waits on a gate and records statements."""
+    
+    def __init__(self, gate: asyncio.Event, executed: list):
+        self.gate = gate
+        self.executed = executed
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    async def execute(self, statement):
+        self.executed.append(statement)
+        await self.gate.wait()
+    
+    async def commit(self):
+        pass
+
+
+def use_fake_sessions(monkeypatch):
+    gate = asyncio.Event()
+    executed = []
+    monkeypatch.setattr(main, "SessionLocal", lambda: FakeSession(gate, executed))
+    monkeypatch.setattr(main, "_last_seen_buffer", {})
+    monkeypatch.setattr(main, "_last_seen_stopping", asyncio.Event())
+    monkeypatch.setattr(main, "_last_seen_flush_task", None)
+    return gate, executed
+
+
+def test_cancelled_flush_requeues_pending(monkeypatch):
+    async def run():
+        _, executed = use_fake_sessions(monkeypatch)
+        main._mark_last_seen("a", "b")
+        flush = asyncio.create_task(main._flush_last_seen())
+        await asyncio.sleep(0)
+        assert executed and main._last_seen_buffer == {}
+        flush.cancel()
+        await asyncio.gather(flush, return_exceptions=True)
+        return dict(main._last_seen_buffer)
+    
+    assert set(asyncio.run(run())) == {"a", "b"}
+
+
+def test_stop_waits_for_in_flight_flush(monkeypatch):
+    monkeypatch.setattr(main, "LAST_SEEN_FLUSH_INTERVAL", 0.01)
+    
+    async def run():
+        gate, executed = use_fake_sessions(monkeypatch)
+        main._start_last_seen_flusher()
+        main._mark_last_seen("a")
+        while not executed:
+            await asyncio.sleep(0.005)
+        # Periodic flush is mid-UPDATE when shutdown begins
+        stop = asyncio.create_task(main._stop_last_seen_flusher())
+        await asyncio.sleep(0.02)
+        assert not stop.done()
+        gate.set()
+        await asyncio.wait_for(stop, timeout=1)
+        return executed
+    
+    executed = asyncio.run(run())
+    assert len(executed) == 1
+    assert main._last_seen_buffer == {}
+    assert main._last_seen_flush_task is None
+
+
+def test_stop_flushes_rows_marked_before_first_interval(monkeypatch):
+    monkeypatch.setattr(main, "LAST_SEEN_FLUSH_INTERVAL", 60)
+    
+    async def run():
+        gate, executed = use_fake_sessions(monkeypatch)
+        gate.set()
+        main._start_last_seen_flusher()
+        main._mark_last_seen("a")
+        await asyncio.wait_for(main._stop_last_seen_flusher(), timeout=1)
+        return executed
+    
+    assert len(asyncio.run(run())) == 1
+    assert main._last_seen_buffer == {}
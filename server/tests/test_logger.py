@@ -0,0 +1,74 @@
+"""
+Unit tests for the queued structured-logging handler and listener
+Handlers are in-memory fakes; no database required
+"""
+import logging
+import queue
+import threading
+import time
+
+import logger
+from logger import DeferredQueueHandler, DeferredQueueListener
+from performance import get_performance_report
+
+
+class BlockingHandler(logging.Handler):
+    """Handler that records messages, stalling on a gate like a blocked stdout."""
+    
+    def __init__(self, gate: threading.Event):
+        super().__init__()
+        self.gate = gate
+        self.messages = []
+    
+    def emit(self, record):
+        self.gate.wait()
+        self.messages.append(record.getMessage())
+
+
+def make_record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, None, None)
+
+
+def test_handler_drops_and_counts_when_queue_full(monkeypatch):
+    monkeypatch.setattr(DeferredQueueHandler, "dropped", 0)
+    handler = DeferredQueueHandler(queue.Queue(1))
+    handler.handle(make_record("kept"))
+    handler.handle(make_record("dropped"))
+    assert handler.queue.qsize() == 1
+    assert DeferredQueueHandler.dropped == 1
+
+
+def test_stop_drains_pending_records_from_full_queue():
+    gate = threading.Event()
+    sink = BlockingHandler(gate)
+    log_queue = queue.Queue(2)
+    listener = DeferredQueueListener(log_queue, sink, stop_timeout=5.0)
+    listener.start()
+    for i in range(3):  # One is being written, two fill the queue
+        log_queue.put(make_record(f"m{i}"))
+    
+    threading.Timer(0.05, gate.set).start()  # stdout unblocks shortly after exit starts
+    listener.stop()
+    assert sink.messages == ["m0", "m1", "m2"]
+
+
+def test_stop_is_bounded_when_stdout_stays_blocked():
+    gate = threading.Event()
+    log_queue = queue.Queue(1)
+    listener = DeferredQueueListener(log_queue, BlockingHandler(gate), stop_timeout=0.05)
+    listener.start()
+    log_queue.put(make_record("stuck"))
+    log_queue.put(make_record("queued"))
+    
+    started = time.monotonic()
+    listener.stop()  # Must not raise queue.Full or hang
+    assert time.monotonic() - started < 1.0
+    gate.set()
+
+
+def test_performance_report_exposes_dropped_records(monkeypatch):
+    monkeypatch.setattr(DeferredQueueHandler, "dropped", 7)
+    monkeypatch.setattr("performance._report_cache", None)
+    stats = get_performance_report()["logging"]
+    assert stats["dropped_records"] == 7
+    assert stats["queue_max_size"] == logger.LOG_QUEUE_MAX_SIZE
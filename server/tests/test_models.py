@@ -0,0 +1,53 @@
+"""
+Unit tests for model helpers: UUIDv7 keys and packed pipeline coordinates
+No database required
+"""
+import time
+import uuid
+
+import numpy as np
+
+from models import decode_coordinates, decode_leaflet_positions, encode_coordinates, uuid7
+
+
+def test_uuid7_sets_version_and_variant():
+    value = uuid.UUID(uuid7())
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+
+def test_uuid7_embeds_millisecond_timestamp():
+    before = time.time_ns() // 1_000_000
+    value = uuid.UUID(uuid7())
+    after = time.time_ns() // 1_000_000
+    assert before <= value.int >> 80 <= after
+
+
+def test_uuid7_sorts_by_creation_time():
+    first = uuid7()
+    time.sleep(0.002)
+    assert uuid7() > first
+
+
+def test_coordinates_round_trip():
+    coords = [[77.5946, 12.9716], [77.6, 12.98], [-0.1276, 51.5072]]
+    data = encode_coordinates(coords)
+    assert len(data) == 8 * len(coords)
+    np.testing.assert_allclose(decode_coordinates(data), coords, rtol=1e-6)
+
+
+def test_coordinates_are_big_endian_float32():
+    # Matches Postgres float4send(), used by migration 012's SQL backfill
+    assert encode_coordinates([[1.0, -2.0]]) == bytes.fromhex("3f800000c0000000")
+
+
+def test_leaflet_positions_swap_to_lat_lng_and_round():
+    positions = decode_leaflet_positions(encode_coordinates([[77.25, 12.5], [77.5946, 12.9716]]))
+    assert positions[0] == [12.5, 77.25]
+    assert all(round(value, 6) == value for value in positions[1])
+    np.testing.assert_allclose(positions[1], [12.9716, 77.5946], atol=1e-5)
+
+
+def test_empty_coordinates():
+    assert decode_coordinates(encode_coordinates(np.empty((0, 2)))).shape == (0, 2)
+    assert decode_leaflet_positions(b"") == []
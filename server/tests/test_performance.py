@@ -0,0 +1,72 @@
+"""
+Unit tests for the SampleRing timing buffer and its slow-sample heap
+No database required
+"""
+import numpy as np
+
+from performance import SampleRing
+
+
+def brute_force_above(ring: SampleRing, threshold: float) -> list:
+    """Reference answer: live durations above threshold, slowest first."""
+    return sorted((float(d) for d in ring.duration_view() if d > threshold), reverse=True)
+
+
+def test_ring_overwrites_oldest_when_full():
+    ring = SampleRing(capacity=3)
+    for duration in (1.0, 2.0, 3.0, 4.0):
+        ring.append("GET /x", duration)
+    assert len(ring) == 3
+    assert sorted(ring.duration_view().tolist()) == [2.0, 3.0, 4.0]
+
+
+def test_ring_interns_labels_once():
+    ring = SampleRing(capacity=4)
+    first = ring.append("GET /a", 1.0)
+    second = ring.append("GET /b", 1.0)
+    again = ring.append("GET /a", 1.0)
+    assert first == again != second
+    assert ring.labels == ["GET /a", "GET /b"]
+
+
+def test_indices_above_served_from_heap_slowest_first():
+    ring = SampleRing(capacity=8, slow_watermark_ms=100.0)
+    for duration in (50.0, 300.0, 120.0, 90.0, 500.0):
+        ring.append("GET /x", duration)
+    indices = ring.indices_above(100.0)
+    assert ring.durations[indices].tolist() == [500.0, 300.0, 120.0]
+
+
+def test_heap_skips_samples_overwritten_in_ring():
+    ring = SampleRing(capacity=3, slow_watermark_ms=100.0)
+    ring.append("GET /x", 900.0)  # Overwritten below
+    for duration in (200.0, 10.0, 150.0):
+        ring.append("GET /x", duration)
+    indices = ring.indices_above(100.0)
+    assert ring.durations[indices].tolist() == [200.0, 150.0]
+
+
+def test_heap_falls_back_to_scan_below_watermark():
+    ring = SampleRing(capacity=8, slow_watermark_ms=100.0)
+    for duration in (50.0, 300.0, 80.0):
+        ring.append("GET /x", duration)
+    indices = ring.indices_above(60.0)
+    assert ring.durations[indices].tolist() == [300.0, 80.0]
+
+
+def test_indices_above_matches_scan_after_heap_evictions():
+    rng = np.random.default_rng(7)
+    ring = SampleRing(capacity=16, slow_watermark_ms=100.0)
+    for duration in rng.uniform(0, 400, size=200).astype(np.float32):
+        ring.append("GET /x", float(duration))
+        for threshold in (100.0, 250.0, 50.0):
+            indices = ring.indices_above(threshold)
+            assert ring.durations[indices].tolist() == brute_force_above(ring, threshold)
+
+
+def test_clear_empties_ring_and_heap():
+    ring = SampleRing(capacity=4, slow_watermark_ms=100.0)
+    ring.append("GET /x", 500.0)
+    ring.clear()
+    assert len(ring) == 0
+    assert ring.indices_above(100.0).size == 0
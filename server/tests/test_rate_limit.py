@@ -0,0 +1,132 @@
+"""
+Unit tests for the in-process rate limiter and client IP keying
+No database required
+"""
+import asyncio
+import logging
+
+import rate_limit
+from middleware import ObservabilityMiddleware
+from rate_limit import RateLimiter, get_client_ip, parse_trusted_proxies
+
+
+TRUSTED = parse_trusted_proxies("10.0.0.0/8")
+
+
+def make_scope(peer: str, forwarded_for=None, path: str = "/api/v1/devices/map/all"):
+    headers = []
+    if forwarded_for is not None:
+        headers.append((b"x-forwarded-for", forwarded_for.encode()))
+    return {"type": "http", "method": "GET", "path": path, "headers": headers, "client": (peer, 50000)}
+
+
+# ============================================================================
+# RateLimiter
+# ============================================================================
+
+def test_limiter_blocks_after_limit():
+    limiter = RateLimiter(requests_per_minute=3)
+    assert [limiter.is_allowed("a") for _ in range(4)] == [True, True, True, False]
+
+
+def test_limiter_keys_are_independent():
+    limiter = RateLimiter(requests_per_minute=1)
+    assert limiter.is_allowed("a")
+    assert not limiter.is_allowed("a")
+    assert limiter.is_allowed("b")
+
+
+def test_limiter_new_window_resets_counts(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    limiter = RateLimiter(requests_per_minute=1, window_seconds=60)
+    
+    assert limiter.is_allowed("a")
+    assert not limiter.is_allowed("a")
+    now[0] = 59.9
+    assert not limiter.is_allowed("a")
+    now[0] = 60.0
+    assert limiter.is_allowed("a")
+
+
+# ============================================================================
+# get_client_ip
+# ============================================================================
+
+def test_client_ip_ignores_forwarded_for_without_trusted_proxies():
+    scope = make_scope("203.0.113.7", forwarded_for="198.51.100.1")
+    assert get_client_ip(scope) == "203.0.113.7"
+
+
+def test_client_ip_ignores_forwarded_for_from_untrusted_peer():
+    scope = make_scope("203.0.113.7", forwarded_for="198.51.100.1")
+    assert get_client_ip(scope, TRUSTED) == "203.0.113.7"
+
+
+def test_client_ip_takes_rightmost_untrusted_hop_from_trusted_proxy():
+    # Client prepended a fake hop; the proxy appended the real address
+    scope = make_scope("10.1.2.3", forwarded_for="1.2.3.4, 198.51.100.1")
+    assert get_client_ip(scope, TRUSTED) == "198.51.100.1"
+
+
+def test_client_ip_skips_trusted_hops_in_proxy_chain():
+    scope = make_scope("10.1.2.3", forwarded_for="198.51.100.1, 10.9.9.9")
+    assert get_client_ip(scope, TRUSTED) == "198.51.100.1"
+
+
+def test_client_ip_falls_back_to_peer_without_header():
+    assert get_client_ip(make_scope("10.1.2.3"), TRUSTED) == "10.1.2.3"
+
+
+# ============================================================================
+# Middleware keying
+# ============================================================================
+
+def run_requests(middleware, scopes):
+    """Send each scope through the middleware and collect response statuses."""
+    statuses = []
+    
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+    
+    async def run():
+        for scope in scopes:
+            await middleware(scope, receive, send)
+    
+    asyncio.run(run())
+    return statuses
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def test_spoofed_forwarded_for_does_not_reset_window():
+    middleware = ObservabilityMiddleware(
+        ok_app,
+        logger=logging.getLogger("test"),
+        rate_limits={"/api/v1/devices/map": RateLimiter(requests_per_minute=2)},
+        sample_rate=0.0,
+        trusted_proxies=TRUSTED
+    )
+    # Direct (untrusted) client rotating a fresh X-Forwarded-For per request
+    scopes = [make_scope("203.0.113.7", forwarded_for=f"198.51.100.{i}") for i in range(4)]
+    assert run_requests(middleware, scopes) == [200, 200, 429, 429]
+
+
+def test_spoofed_hop_behind_trusted_proxy_does_not_reset_window():
+    middleware = ObservabilityMiddleware(
+        ok_app,
+        logger=logging.getLogger("test"),
+        rate_limits={"/api/v1/devices/map": RateLimiter(requests_per_minute=2)},
+        sample_rate=0.0,
+        trusted_proxies=TRUSTED
+    )
+    # Client prepends random hops; the proxy always appends the real address
+    scopes = [make_scope("10.1.2.3", forwarded_for=f"1.1.1.{i}, 198.51.100.1") for i in range(4)]
+    assert run_requests(middleware, scopes) == [200, 200, 429, 429]
@@ -0,0 +1,52 @@
+"""
+Unit tests for splitting and batching migration SQL
+No database required
+"""
+from run_migration import group_statements, split_sql_statements
+
+
+def test_split_simple_statements():
+    sql = "CREATE TABLE a (id int);\nCREATE TABLE b (id int);\n"
+    assert split_sql_statements(sql) == ["CREATE TABLE a (id int);", "CREATE TABLE b (id int);"]
+
+
+def test_split_ignores_semicolons_in_strings_and_comments():
+    sql = (
+        "-- header; not a statement\n"
+        "INSERT INTO t VALUES ('a;b', 'it''s; fine');\n"
+        "SELECT 1; -- trailing; comment\n"
+    )
+    assert split_sql_statements(sql) == [
+        "INSERT INTO t VALUES ('a;b', 'it''s; fine');",
+        "SELECT 1;",
+    ]
+
+
+def test_split_keeps_dollar_quoted_body_whole():
+    body = "DO $$ BEGIN PERFORM 1; PERFORM 2; END $$;"
+    assert split_sql_statements(f"{body}\nSELECT 1;") == [body, "SELECT 1;"]
+
+
+def test_split_keeps_unterminated_tail():
+    assert split_sql_statements("SELECT 1;\nSELECT 2") == ["SELECT 1;", "SELECT 2"]
+
+
+def test_split_empty_and_comment_only_input():
+    assert split_sql_statements("") == []
+    assert split_sql_statements("-- nothing here\n\n") == []
+
+
+def test_group_isolates_dollar_bodies_and_concurrent_indexes():
+    statements = [
+        "CREATE TABLE a (id int);",
+        "ALTER TABLE a ADD COLUMN x int;",
+        "DO $$ BEGIN PERFORM 1; END $$;",
+        "create index concurrently ix_a_x on a(x);",
+        "ANALYZE a;",
+    ]
+    assert group_statements(statements) == (
+        ("CREATE TABLE a (id int);", "ALTER TABLE a ADD COLUMN x int;"),
+        ("DO $$ BEGIN PERFORM 1; END $$;",),
+        ("create index concurrently ix_a_x on a(x);",),
+        ("ANALYZE a;",),
+    )
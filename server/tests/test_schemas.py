@@ -0,0 +1,27 @@
+"""
+Unit tests for request schema validation
+"""
+import pytest
+from pydantic import ValidationError
+
+from schemas import MAX_TELEMETRY_BATCH, TelemetryBatchRequest
+
+
+def test_telemetry_batch_dedupes_ids_in_order():
+    batch = TelemetryBatchRequest(device_ids=["b", "a", "b", "c", "a"])
+    assert batch.device_ids == ["b", "a", "c"]
+
+
+def test_telemetry_batch_rejects_oversized_list():
+    with pytest.raises(ValidationError):
+        TelemetryBatchRequest(device_ids=[str(i) for i in range(MAX_TELEMETRY_BATCH + 1)])
+
+
+def test_telemetry_batch_accepts_limit():
+    batch = TelemetryBatchRequest(device_ids=[str(i) for i in range(MAX_TELEMETRY_BATCH)])
+    assert len(batch.device_ids) == MAX_TELEMETRY_BATCH
+
+
+def test_telemetry_batch_rejects_empty_list():
+    with pytest.raises(ValidationError):
+        TelemetryBatchRequest(device_ids=[])
@@ -0,0 +1,111 @@
+"""
+Unit tests for ThingSpeak request coalescing (singleflight)
+Upstream fetches are replaced with controllable fakes; no network access
+"""
+import asyncio
+
+import pytest
+
+from thingspeak import ThingSpeakClient
+
+
+def make_client(monkeypatch):
+    """Client whose _fetch_latest blocks on a gate and counts calls per read key."""
+    client = ThingSpeakClient()
+    client.gate = asyncio.Event()
+    client.calls = []
+    
+    async def fake_fetch_latest(channel_id, read_key, cache_key):
+        client.calls.append(read_key)
+        await client.gate.wait()
+        return {"channel": channel_id, "key": read_key}
+    
+    monkeypatch.setattr(client, "_fetch_latest", fake_fetch_latest)
+    return client
+
+
+def test_concurrent_requests_share_one_fetch(monkeypatch):
+    async def run():
+        client = make_client(monkeypatch)
+        waiters = [asyncio.create_task(client.get_latest("42", "k")) for _ in range(5)]
+        await asyncio.sleep(0)
+        client.gate.set()
+        results = await asyncio.gather(*waiters)
+        await client.close()
+        return client, results
+    
+    client, results = asyncio.run(run())
+    assert client.calls == ["k"]
+    assert results == [{"channel": "42", "key": "k"}] * 5
+    assert client._inflight == {}
+
+
+def test_leader_cancellation_does_not_fail_followers(monkeypatch):
+    async def run():
+        client = make_client(monkeypatch)
+        leader = asyncio.create_task(client.get_latest("42", "k"))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(client.get_latest("42", "k"))
+        await asyncio.sleep(0)
+        
+        leader.cancel()  # e.g. the first client disconnected
+        await asyncio.sleep(0)
+        client.gate.set()
+        
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        result = await follower
+        await client.close()
+        return client, result
+    
+    client, result = asyncio.run(run())
+    assert result == {"channel": "42", "key": "k"}
+    assert client.calls == ["k"]
+
+
+def test_different_read_keys_are_not_coalesced(monkeypatch):
+    async def run():
+        client = make_client(monkeypatch)
+        waiters = [
+            asyncio.create_task(client.get_latest("42", "key-a")),
+            asyncio.create_task(client.get_latest("42", "key-b")),
+            asyncio.create_task(client.get_latest("42")),
+        ]
+        await asyncio.sleep(0)
+        client.gate.set()
+        results = await asyncio.gather(*waiters)
+        await client.close()
+        return client, results
+    
+    client, results = asyncio.run(run())
+    assert sorted(client.calls, key=str) == sorted(["key-a", "key-b", None], key=str)
+    assert [r["key"] for r in results] == ["key-a", "key-b", None]
+
+
+def test_fetch_error_reaches_every_waiter(monkeypatch):
+    async def run():
+        client = ThingSpeakClient()
+        gate = asyncio.Event()
+        
+        async def failing_fetch():
+            await gate.wait()
+            raise RuntimeError("upstream down")
+        
+        waiters = [asyncio.create_task(client._singleflight("k", failing_fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        gate.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        await client.close()
+        return client, results
+    
+    client, results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert client._inflight == {}
+
+
+def test_credential_tag_hides_read_key():
+    tag = ThingSpeakClient._credential_tag("SECRETKEY123")
+    assert "SECRETKEY123" not in tag
+    assert tag == ThingSpeakClient._credential_tag("SECRETKEY123")
+    assert tag != ThingSpeakClient._credential_tag("OTHERKEY")
+    assert ThingSpeakClient._credential_tag(None) == "public"
@@ -2,8 +2,11 @@
 ThingSpeak API client.
 Simple wrapper for fetching telemetry data from ThingSpeak channels.
 """
+import asyncio
+import hashlib
+import time
 import httpx
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Awaitable
 
 
 class ThingSpeakClient:
@@ -12,11 +15,56 @@ class ThingSpeakClient:
     BASE_URL = "https://api.thingspeak.com"
     CACHE_TTL = 30  # Cache data for 30 seconds
     
+    # Shared keep-alive pool: reuse TCP+TLS connections across requests
+    TIMEOUT = httpx.Timeout(5.0, connect=2.0)  # Fail fast on unreachable API
+    LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    
     def __init__(self):
-        self.client = httpx.AsyncClient(timeout=10.0)
-        self._cache = {}  # Simple in-memory cache: {channel_id: (timestamp, data)}
+        self.client = httpx.AsyncClient(
+            http2=True,
+            timeout=self.TIMEOUT,
+            limits=self.LIMITS
+        )
+        self._cache = {}  # Simple in-memory cache: {request_key: (timestamp, data)}
         self._last_request_time = 0
         self._min_request_interval = 0.25  # 250ms between requests (4 req/sec max)
+        self._inflight: Dict[str, asyncio.Task] = {}  # Singleflight: {request_key: fetch task}
+    
+    @staticmethod
+    def _credential_tag(read_key: Optional[str]) -> str:
+        """
+        Short digest of the read key for cache/singleflight keys, so callers
+        with different credentials never share a result (and keys never hold
+        the API key itself).
+        """
+        if not read_key:
+            return "public"
+        return hashlib.sha256(read_key.encode()).hexdigest()[:16]
+    
+    async def _singleflight(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Coalesce concurrent identical requests into one upstream call.
+        The first caller for a key starts the fetch as its own task; every
+        caller (the first included) awaits it through asyncio.shield, so a
+        cancelled caller (e.g. client disconnect) only stops waiting and
+        never cancels the fetch the others are waiting on.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish_inflight(key, done))
+        return await asyncio.shield(task)
+    
+    def _finish_inflight(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved: every waiter may have been cancelled
     
     async def get_latest(
         self,
@@ -40,17 +88,26 @@ class ThingSpeakClient:
                 ...
             }
         """
-        import time
-        import asyncio
-        
         # Check cache first
-        cache_key = f"latest:{channel_id}"
+        cache_key = f"latest:{channel_id}:{self._credential_tag(read_key)}"
         if cache_key in self._cache:
             timestamp, data = self._cache[cache_key]
             if time.time() - timestamp < self.CACHE_TTL:
                 print(f"[CACHE HIT] ThingSpeak channel {channel_id}")
                 return data
         
+        return await self._singleflight(
+            cache_key,
+            lambda: self._fetch_latest(channel_id, read_key, cache_key)
+        )
+    
+    async def _fetch_latest(
+        self,
+        channel_id: str,
+        read_key: Optional[str],
+        cache_key: str
+    ) -> Dict[str, Any]:
+        """Fetch latest reading from ThingSpeak (rate limited) and cache it."""
         # Rate limiting
         time_since_last_request = time.time() - self._last_request_time
         if time_since_last_request < self._min_request_interval:
@@ -109,8 +166,21 @@ class ThingSpeakClient:
                 ]
             }
         """
+        results = min(results, 8000)  # ThingSpeak max is 8000
+        return await self._singleflight(
+            f"history:{channel_id}:{results}:{self._credential_tag(read_key)}",
+            lambda: self._fetch_history(channel_id, read_key, results)
+        )
+    
+    async def _fetch_history(
+        self,
+        channel_id: str,
+        read_key: Optional[str],
+        results: int
+    ) -> Dict[str, Any]:
+        """Fetch historical feed data from ThingSpeak."""
         url = f"{self.BASE_URL}/channels/{channel_id}/feeds.json"
-        params = {"results": min(results, 8000)}  # ThingSpeak max is 8000
+        params = {"results": results}
         if read_key:
             params["api_key"] = read_key
         
@@ -125,6 +195,18 @@ class ThingSpeakClient:
             print(f"[ERROR] Unexpected error fetching ThingSpeak history: {e}")
             return {"channel": {}, "feeds": []}
     
+    async def warmup(self) -> bool:
+        """
+        Open a pooled connection to ThingSpeak (TCP + TLS + HTTP/2) ahead of
+        the first telemetry request. Returns False if the API is unreachable.
+        """
+        try:
+            await self.client.head(self.BASE_URL, timeout=3.0)
+            return True
+        except httpx.HTTPError as e:
+            print(f"[WARN] ThingSpeak warmup failed: {e}")
+            return False
+    
     async def close(self):
         """Close the HTTP client."""
         await self.client.aclose()
@@ -135,8 +217,19 @@ _thingspeak_client: Optional[ThingSpeakClient] = None
 
 
 def get_thingspeak_client() -> ThingSpeakClient:
-    """Get or create ThingSpeak client singleton."""
+    """
+    Get or create ThingSpeak client singleton.
+    All callers share one httpx.AsyncClient and its connection pool.
+    """
     global _thingspeak_client
     if _thingspeak_client is None:
         _thingspeak_client = ThingSpeakClient()
     return _thingspeak_client
+
+
+async def close_thingspeak_client() -> None:
+    """Close the shared client (if it was created) and reset the singleton."""
+    global _thingspeak_client
+    if _thingspeak_client is not None:
+        await _thingspeak_client.close()
+        _thingspeak_client = None